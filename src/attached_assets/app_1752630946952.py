@@ -1,10 +1,27 @@
 import os
 import json
-import google.generativeai as genai
-from deep_translator import GoogleTranslator
-import gradio as gr
 from dotenv import load_dotenv
 import re
+import asyncio
+import contextvars
+import functools
+import hashlib
+import inspect
+import mmap
+import sqlite3
+import struct
+import threading
+import unicodedata
+import uuid
+import math
+import random
+import time
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# Load environment variables from .env file if it exists (for local development)
+load_dotenv()
 
 # Language code mapping
 LANG_MAP = {
@@ -13,10 +30,1186 @@ LANG_MAP = {
     'English': 'en'
 }
 
+# Prefix shown in front of translated messages
+LANG_PREFIX = {
+    'Hindi': '[हिंदी] ',
+    'Telugu': '[తెలుగు] '
+}
+
+# Sentence boundaries used both for chunking and for streaming translation.
+# Besides .!? this covers the Devanagari danda (।) and double danda (॥).
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?।॥])\s+')
+
+# Unicode blocks of the scripts we translate into, by language code
+SCRIPT_PATTERNS = {
+    'hi': re.compile(r'[\u0900-\u097F]'),  # Devanagari
+    'te': re.compile(r'[\u0C00-\u0C7F]'),  # Telugu
+    'en': re.compile(r'[A-Za-z]'),          # Latin
+}
+# Letters outside those blocks
+OTHER_LETTER = re.compile(r'[^\W\d_\u0900-\u097F\u0C00-\u0C7FA-Za-z]')
+# Code, links and e-mail addresses are never sent to the translator
+CODE_SEGMENT = re.compile(
+    r'(```.*?```|`[^`\n]+`|(?:https?://|www\.)\S+|[\w.+-]+@[\w-]+\.[\w.]+)', re.DOTALL
+)
+
+# Translation cache settings (override through environment variables)
+TRANSLATION_CACHE_SIZE = int(os.getenv('TRANSLATION_CACHE_SIZE', '2048'))
+TRANSLATION_CACHE_TTL = float(os.getenv('TRANSLATION_CACHE_TTL', str(7 * 24 * 3600)))
+TRANSLATION_CACHE_DB = os.getenv('TRANSLATION_CACHE_DB', '')
+# Rows kept in the SQLite tier; the oldest beyond this are purged
+TRANSLATION_CACHE_DB_MAX_ROWS = int(os.getenv('TRANSLATION_CACHE_DB_MAX_ROWS', '100000'))
+
+# Translation concurrency settings. TRANSLATION_CONCURRENCY caps the number of
+# translator calls in flight across the whole process, which keeps us inside
+# the upstream rate limits no matter how many messages are being translated.
+TRANSLATION_CONCURRENCY = max(1, int(os.getenv('TRANSLATION_CONCURRENCY', '8')))
+TRANSLATION_MESSAGE_WORKERS = max(1, int(os.getenv('TRANSLATION_MESSAGE_WORKERS', '8')))
+# Character budget for one batched translator request. deep-translator rejects
+# Google requests over 5000 characters, so stay a little below that.
+TRANSLATION_BATCH_CHARS = int(os.getenv('TRANSLATION_BATCH_CHARS', '4500'))
+# Text whose letters are at least this share in the target script (e.g. a
+# user typing in Telugu) is already translated and is not sent to the translator
+SCRIPT_SKIP_RATIO = float(os.getenv('SCRIPT_SKIP_RATIO', '0.6'))
+
+# Translation engine: google (deep-translator, the default), local (a CPU
+# model run in worker processes) or fake (offline, for tests)
+TRANSLATION_BACKEND = os.getenv('TRANSLATION_BACKEND', 'google')
+TRANSLATION_LOCAL_MODEL = os.getenv('TRANSLATION_LOCAL_MODEL', 'facebook/nllb-200-distilled-600M')
+TRANSLATION_LOCAL_WORKERS = max(1, int(os.getenv('TRANSLATION_LOCAL_WORKERS', '2')))
+# Seconds to wait for a local translation; the first one also waits for the
+# model to load, and falls back to the original text if that takes longer
+TRANSLATION_LOCAL_TIMEOUT = float(os.getenv('TRANSLATION_LOCAL_TIMEOUT', '30'))
+
+# Client-side rate limits, retries and circuit breakers for upstream services
+TRANSLATOR_RATE = float(os.getenv('TRANSLATOR_RATE', '10'))  # requests per second
+TRANSLATOR_BURST = int(os.getenv('TRANSLATOR_BURST', '20'))
+GEMINI_RATE = float(os.getenv('GEMINI_RATE', '5'))
+GEMINI_BURST = int(os.getenv('GEMINI_BURST', '10'))
+GEMINI_MAX_ATTEMPTS = max(1, int(os.getenv('GEMINI_MAX_ATTEMPTS', '3')))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', '5'))
+BREAKER_RESET_TIMEOUT = float(os.getenv('BREAKER_RESET_TIMEOUT', '30'))
+
+# Stream Gemini answers into the chat as they are generated
+STREAM_RESPONSES = os.getenv('STREAM_RESPONSES', 'true').lower() in ('1', 'true', 'yes')
+# In Hindi/Telugu sessions, translate each streamed sentence as soon as it is complete
+PIPELINED_TRANSLATION = os.getenv('PIPELINED_TRANSLATION', 'true').lower() in ('1', 'true', 'yes')
+
+# Translate every new answer into the other languages in the background, so
+# language switches only re-render. At most PRETRANSLATE_MAX_PENDING turns wait.
+PRETRANSLATE_RESPONSES = os.getenv('PRETRANSLATE_RESPONSES', 'false').lower() in ('1', 'true', 'yes')
+PRETRANSLATE_WORKERS = max(1, int(os.getenv('PRETRANSLATE_WORKERS', '2')))
+PRETRANSLATE_MAX_PENDING = int(os.getenv('PRETRANSLATE_MAX_PENDING', '200'))
+
+# Gradio queue settings. Chat and language switches get separate concurrency
+# groups so a run of slow Gemini calls cannot starve the language buttons.
+QUEUE_CONCURRENCY = max(1, int(os.getenv('QUEUE_CONCURRENCY', '16')))
+QUEUE_MAX_SIZE = int(os.getenv('QUEUE_MAX_SIZE', '200'))
+CHAT_CONCURRENCY = max(1, int(os.getenv('CHAT_CONCURRENCY', '12')))
+LANGUAGE_CONCURRENCY = max(1, int(os.getenv('LANGUAGE_CONCURRENCY', '8')))
+
+# Response cache settings for repeated tourism questions
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '512'))
+RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', str(24 * 3600)))
+RESPONSE_CACHE_THRESHOLD = float(os.getenv('RESPONSE_CACHE_THRESHOLD', '0.9'))
+RESPONSE_CACHE_PREWARM = os.getenv('RESPONSE_CACHE_PREWARM', 'false').lower() in ('1', 'true', 'yes')
+
+# Precomputed answers to common questions in every language (built by
+# build_knowledge_pack.py); set KNOWLEDGE_PACK_PATH to '' to disable
+KNOWLEDGE_PACK_PATH = os.getenv(
+    'KNOWLEDGE_PACK_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'knowledge_pack.bin')
+)
+# How often (seconds) to check whether the pack file was rebuilt
+KNOWLEDGE_PACK_RELOAD_INTERVAL = float(os.getenv('KNOWLEDGE_PACK_RELOAD_INTERVAL', '60'))
+
+# Conversation context sent with each question: the most recent turns are
+# included verbatim, older ones as one-line summaries, all within a budget
+CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', '1500'))
+CONTEXT_RECENT_TURNS = int(os.getenv('CONTEXT_RECENT_TURNS', '3'))
+LOG_PROMPT_SIZE = os.getenv('LOG_PROMPT_SIZE', 'false').lower() in ('1', 'true', 'yes')
+
+# Server-side chat sessions. Gradio state only carries a session ID; sessions
+# keep at most SESSION_MAX_TURNS turns and render the last SESSION_VISIBLE_TURNS.
+SESSION_MAX_TURNS = max(1, int(os.getenv('SESSION_MAX_TURNS', '50')))
+SESSION_VISIBLE_TURNS = max(1, int(os.getenv('SESSION_VISIBLE_TURNS', '20')))
+SESSION_MAX_COUNT = max(1, int(os.getenv('SESSION_MAX_COUNT', '10000')))
+SESSION_TTL = float(os.getenv('SESSION_TTL', str(6 * 3600)))  # seconds idle
+
+# Gemini prompt handling. With GEMINI_SYSTEM_INSTRUCTION the system prompt is
+# set once on the model instead of being prepended to every request; with
+# GEMINI_CACHED_CONTENT it is also stored as cached content, so its tokens are
+# not processed again on each call (needs a versioned model that supports
+# caching, e.g. models/gemini-1.5-flash-001, and a prompt above the minimum
+# cache size). PROMPT_TEMPLATES_FILE is a JSON file of per-language prompts.
+GEMINI_MODEL_NAME = os.getenv('GEMINI_MODEL_NAME', 'models/gemini-1.5-flash')
+GEMINI_SYSTEM_INSTRUCTION = os.getenv('GEMINI_SYSTEM_INSTRUCTION', 'true').lower() in ('1', 'true', 'yes')
+GEMINI_CACHED_CONTENT = os.getenv('GEMINI_CACHED_CONTENT', 'false').lower() in ('1', 'true', 'yes')
+GEMINI_CACHE_TTL = float(os.getenv('GEMINI_CACHE_TTL', '3600'))
+PROMPT_TEMPLATES_FILE = os.getenv('PROMPT_TEMPLATES_FILE', '')
+
+# Output-length and latency budgets per query type (see classify_query).
+# QUERY_BUDGETS is JSON overriding the defaults, e.g.
+# {"quick_fact": {"max_output_tokens": 200, "timeout": 8}}
+QUERY_BUDGETS_ENABLED = os.getenv('QUERY_BUDGETS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+QUERY_BUDGETS_OVERRIDES = os.getenv('QUERY_BUDGETS', '')
+
+# Instrumentation: serve /metrics next to the UI, optionally log per-request traces
+METRICS_ENDPOINT = os.getenv('METRICS_ENDPOINT', 'false').lower() in ('1', 'true', 'yes')
+TRACE_LOG = os.getenv('TRACE_LOG', '')
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class Metrics:
+    """
+    Minimal in-process metrics registry with Prometheus text output.
+
+    Counters, gauges and latency histograms are identified by name plus a
+    set of labels (e.g. ``stage``, ``language``).
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._counters = Counter()
+        self._gauges = Counter()
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items() if value is not None))
+
+    def inc(self, name, amount=1, **labels):
+        with self._lock:
+            self._counters[self._key(name, labels)] += amount
+
+    def add_gauge(self, name, amount, **labels):
+        with self._lock:
+            self._gauges[self._key(name, labels)] += amount
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram['buckets'][index] += 1
+                    break
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def counter_value(self, name, **labels):
+        with self._lock:
+            return self._counters.get(self._key(name, labels), 0)
+
+    def gauge_total(self, name):
+        """Sum of a gauge over all of its label sets."""
+        with self._lock:
+            return sum(value for (gauge, _), value in self._gauges.items() if gauge == name)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    @staticmethod
+    def _format_labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        escaped = (value.replace('\\', '\\\\').replace('"', '\\"') for _, value in pairs)
+        return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = sorted(
+                (key, dict(value, buckets=list(value['buckets']))) for key, value in self._histograms.items()
+            )
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                lines.append(f"# TYPE {name} counter")
+                seen.add(name)
+            lines.append(f"{name}{self._format_labels(labels)} {value}")
+        for (name, labels), value in gauges:
+            if name not in seen:
+                lines.append(f"# TYPE {name} gauge")
+                seen.add(name)
+            lines.append(f"{name}{self._format_labels(labels)} {value}")
+        for (name, labels), histogram in histograms:
+            if name not in seen:
+                lines.append(f"# TYPE {name} histogram")
+                seen.add(name)
+            cumulative = 0
+            for bound, count in zip(self.buckets, histogram['buckets']):
+                cumulative += count
+                lines.append(f"{name}_bucket{self._format_labels(labels, [('le', repr(bound))])} {cumulative}")
+            lines.append(f"{name}_bucket{self._format_labels(labels, [('le', '+Inf')])} {histogram['count']}")
+            lines.append(f"{name}_sum{self._format_labels(labels)} {histogram['sum']}")
+            lines.append(f"{name}_count{self._format_labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+
+# The trace of the request being handled, if TRACE_LOG is enabled
+_current_trace = contextvars.ContextVar('saanchari_trace', default=None)
+_trace_lock = threading.Lock()
+
+@contextmanager
+def timed(stage, **labels):
+    """Time a block into saanchari_stage_seconds and the current request trace."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.observe('saanchari_stage_seconds', elapsed, stage=stage, **labels)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace['spans'].append(dict(labels, stage=stage, ms=round(elapsed * 1000, 2)))
+
+def record_error(where):
+    """Count an error caught (and printed) in one of the hot-path functions."""
+    metrics.inc('saanchari_errors_total', where=where)
+
+def _write_trace(trace):
+    try:
+        with _trace_lock, open(TRACE_LOG, 'a', encoding='utf-8') as trace_file:
+            trace_file.write(json.dumps(trace, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"Could not write trace log: {e}")
+
+def instrument_handler(name, language_arg):
+    """
+    Decorate a Gradio handler to record its total time, in-flight count and trace.
+
+    ``language_arg`` is the position of the argument holding the session or
+    target language; its LANG_MAP code is the ``language`` label, as in the
+    stage metrics. Works for plain, generator and async functions.
+    """
+    def start(args):
+        language = get_translator(args[language_arg]) if len(args) > language_arg else None
+        metrics.add_gauge('saanchari_inflight_requests', 1, handler=name)
+        trace = None
+        if TRACE_LOG:
+            trace = {'handler': name, 'language': language, 'started': time.time(), 'spans': []}
+        return language, trace, time.perf_counter()
+
+    def finish(language, trace, started):
+        elapsed = time.perf_counter() - started
+        metrics.add_gauge('saanchari_inflight_requests', -1, handler=name)
+        metrics.observe('saanchari_stage_seconds', elapsed, stage='handler', handler=name, language=language)
+        if trace is not None:
+            trace['total_ms'] = round(elapsed * 1000, 2)
+            _write_trace(trace)
+
+    def decorator(fn):
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                language, trace, started = start(args)
+                generator = fn(*args, **kwargs)
+                try:
+                    while True:
+                        # Each resume may run in a different thread/context
+                        token = _current_trace.set(trace)
+                        try:
+                            item = next(generator)
+                        except StopIteration:
+                            return
+                        finally:
+                            _current_trace.reset(token)
+                        yield item
+                finally:
+                    generator.close()
+                    finish(language, trace, started)
+        elif inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                language, trace, started = start(args)
+                token = _current_trace.set(trace)
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    _current_trace.reset(token)
+                    finish(language, trace, started)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                language, trace, started = start(args)
+                token = _current_trace.set(trace)
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    _current_trace.reset(token)
+                    finish(language, trace, started)
+        return wrapper
+    return decorator
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """Thread pool that runs tasks in the submitter's context, so traces follow the work."""
+
+    def submit(self, fn, *args, **kwargs):
+        context = contextvars.copy_context()
+        return super().submit(context.run, fn, *args, **kwargs)
+
 def get_translator(lang_code):
     """Get the appropriate language code for translation."""
     return LANG_MAP.get(lang_code, 'en')
 
+def normalize_text(text):
+    """Collapse whitespace so equivalent chunks share a cache key."""
+    return ' '.join(text.split())
+
+def script_ratios(text):
+    """
+    Share of the letters in text per script of SCRIPT_PATTERNS, plus 'other'.
+
+    Returns an empty dict for text without letters (numbers, punctuation,
+    emoji).
+    """
+    counts = {lang_code: len(pattern.findall(text)) for lang_code, pattern in SCRIPT_PATTERNS.items()}
+    counts['other'] = len(OTHER_LETTER.findall(text))
+    total = sum(counts.values())
+    if not total:
+        return {}
+    return {script: count / total for script, count in counts.items()}
+
+def translation_skip_reason(text, lang_code):
+    """
+    Why text needs no translation into lang_code, or None if it does.
+
+    'target_script' when it is already mostly in the target script, 'code'
+    when nothing but code or links is left, 'no_letters' when there is
+    nothing to translate at all.
+    """
+    prose = CODE_SEGMENT.sub(' ', text)
+    ratios = script_ratios(prose)
+    if not ratios:
+        return 'code' if prose != text else 'no_letters'
+    if ratios.get(lang_code, 0) >= SCRIPT_SKIP_RATIO:
+        return 'target_script'
+    return None
+
+def source_language(text, default='en'):
+    """The LANG_MAP code whose script most of text's letters are in (``default`` if none)."""
+    ratios = script_ratios(text)
+    best = max(SCRIPT_PATTERNS, key=lambda lang_code: ratios.get(lang_code, 0))
+    return best if ratios.get(best, 0) > 0 else default
+
+def skip_translation(text, lang_code):
+    """Whether to leave text as it is, counting the skipped translator calls."""
+    reason = translation_skip_reason(text, lang_code)
+    if reason is None:
+        return False
+    metrics.inc('saanchari_translation_skips_total', reason=reason, language=lang_code)
+    return True
+
+class TranslationCache:
+    """
+    Two-tier cache for translated chunks keyed on (normalized text, language code).
+
+    The first tier is an in-memory LRU bounded by ``max_size`` entries. The
+    optional second tier is a SQLite file so translations survive restarts;
+    it keeps at most ``max_rows`` rows. Entries older than ``ttl`` seconds are
+    treated as missing in both tiers and purged from disk.
+    """
+
+    def __init__(self, max_size=2048, ttl=7 * 24 * 3600, db_path=None, max_rows=100000, purge_every=1000):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.purge_every = purge_every
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # SQLite I/O has its own lock, so memory hits never wait on the disk
+        self._db_lock = threading.Lock()
+        self._db = None
+        self._writes = 0
+        if db_path:
+            try:
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                # WAL lets readers run alongside a commit, and without a sync
+                # on every commit a write costs little more than the INSERT
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("PRAGMA synchronous=NORMAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS translations ("
+                    "lang TEXT NOT NULL, source TEXT NOT NULL, "
+                    "translated TEXT NOT NULL, created REAL NOT NULL, "
+                    "PRIMARY KEY (lang, source))"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS translations_created ON translations (created)")
+                self._db.commit()
+                self.purge()
+            except sqlite3.Error as e:
+                print(f"Translation cache database unavailable: {e}")
+                self._db = None
+
+    def _expired(self, created):
+        return self.ttl is not None and self.ttl > 0 and time.time() - created > self.ttl
+
+    def get(self, text, lang_code):
+        """Return the cached translation or None."""
+        key = (normalize_text(text), lang_code)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                translated, created = entry
+                if not self._expired(created):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    metrics.inc('saanchari_cache_lookups_total', cache='translation', result='hit', language=lang_code)
+                    return translated
+                del self._entries[key]
+
+        row = None
+        if self._db is not None:
+            try:
+                with self._db_lock:
+                    row = self._db.execute(
+                        "SELECT translated, created FROM translations WHERE lang = ? AND source = ?",
+                        (lang_code, key[0])
+                    ).fetchone()
+            except sqlite3.Error as e:
+                print(f"Translation cache read error: {e}")
+
+        with self._lock:
+            if row and not self._expired(row[1]):
+                self._store(key, row[0], row[1])
+                self.hits += 1
+                self.disk_hits += 1
+                metrics.inc('saanchari_cache_lookups_total', cache='translation', result='disk_hit', language=lang_code)
+                return row[0]
+
+            self.misses += 1
+            metrics.inc('saanchari_cache_lookups_total', cache='translation', result='miss', language=lang_code)
+            return None
+
+    def set(self, text, lang_code, translated):
+        """Store a translation in both tiers."""
+        key = (normalize_text(text), lang_code)
+        created = time.time()
+        with self._lock:
+            self._store(key, translated, created)
+        if self._db is None:
+            return
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO translations (lang, source, translated, created) "
+                    "VALUES (?, ?, ?, ?)",
+                    (lang_code, key[0], translated, created)
+                )
+                self._db.commit()
+                self._writes += 1
+                due = self.purge_every and self._writes % self.purge_every == 0
+        except sqlite3.Error as e:
+            print(f"Translation cache write error: {e}")
+            return
+        if due:
+            self.purge()
+
+    def purge(self):
+        """
+        Bound the disk tier: delete expired rows, then the oldest beyond ``max_rows``.
+
+        Runs when the cache opens and after every ``purge_every`` writes.
+        Returns the number of rows deleted.
+        """
+        if self._db is None:
+            return 0
+        deleted = 0
+        try:
+            with self._db_lock:
+                if self.ttl is not None and self.ttl > 0:
+                    deleted += self._db.execute(
+                        "DELETE FROM translations WHERE created < ?", (time.time() - self.ttl,)
+                    ).rowcount
+                if self.max_rows:
+                    deleted += self._db.execute(
+                        "DELETE FROM translations WHERE rowid IN ("
+                        "SELECT rowid FROM translations ORDER BY created DESC LIMIT -1 OFFSET ?)",
+                        (self.max_rows,)
+                    ).rowcount
+                self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Translation cache purge error: {e}")
+        return deleted
+
+    def _store(self, key, translated, created):
+        self._entries[key] = (translated, created)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every entry from memory and disk and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
+        if self._db is not None:
+            try:
+                with self._db_lock:
+                    self._db.execute("DELETE FROM translations")
+                    self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Translation cache clear error: {e}")
+
+    def stats(self):
+        """Return hit/miss counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+            }
+
+class UpstreamUnavailable(Exception):
+    """Raised when a call is refused locally by the rate limiter or circuit breaker."""
+
+class TokenBucket:
+    """Token bucket allowing ``rate`` calls per second with bursts up to ``capacity``."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        """Take a token if one is available; otherwise return seconds until the next one."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate if self.rate > 0 else float('inf')
+
+class CircuitBreaker:
+    """
+    Stops calling an upstream after ``failure_threshold`` consecutive failures.
+
+    After ``reset_timeout`` seconds one trial call is let through (half-open);
+    success closes the breaker again, failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'open':
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = 'half-open'
+                return True
+            if self.state == 'half-open':
+                # Only the single trial call is allowed while half-open
+                return False
+            return True
+
+    def release(self):
+        """Give back a half-open trial that never reached the upstream."""
+        with self._lock:
+            if self.state == 'half-open':
+                self.state = 'open'
+                self._opened_at = time.monotonic() - self.reset_timeout
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == 'half-open' or self._failures >= self.failure_threshold:
+                self.state = 'open'
+                self._opened_at = time.monotonic()
+
+class Upstream:
+    """
+    Shared call path for an upstream service (translator, Gemini).
+
+    Every attempt waits for a rate-limit token, is refused while the circuit
+    breaker is open, and failed attempts are retried with exponential backoff
+    and full jitter. Latency, retries and refusals are recorded for stats()
+    and exported as saanchari_upstream_* metrics.
+    """
+
+    def __init__(self, name, rate, burst, max_attempts=3, base_delay=0.25, max_delay=4.0,
+                 max_wait=5.0, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_wait = max_wait
+        self.counters = Counter()
+        self.latencies = deque(maxlen=2000)
+        self._lock = threading.Lock()
+
+    def _count(self, key, amount=1, language=None):
+        with self._lock:
+            self.counters[key] += amount
+        metrics.inc('saanchari_upstream_events_total', amount, upstream=self.name, event=key, language=language)
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _admit(self, language=None):
+        """Return how long to wait for a token, or raise if the call is refused."""
+        if not self.breaker.allow():
+            self._count('short_circuited', language=language)
+            raise UpstreamUnavailable(f"{self.name} circuit breaker is open")
+        wait = self.bucket.try_acquire()
+        if wait > self.max_wait:
+            self.breaker.release()
+            self._count('rate_limited', language=language)
+            raise UpstreamUnavailable(f"{self.name} rate limit exceeded")
+        return wait
+
+    def _out_of_time(self, deadline, delay=0.0):
+        """Whether waiting ``delay`` more seconds would run past ``deadline`` (a perf_counter value)."""
+        return deadline is not None and time.perf_counter() + delay >= deadline
+
+    def _wait_allowed(self, wait, deadline, language=None):
+        """Refuse a rate-limit wait that would run past the deadline."""
+        if wait > 0 and self._out_of_time(deadline, wait):
+            self.breaker.release()
+            self._count('deadline_exceeded', language=language)
+            raise UpstreamUnavailable(f"{self.name} call would miss its deadline")
+
+    def _finish(self, started, error=None, language=None):
+        elapsed = time.perf_counter() - started
+        self.latencies.append(elapsed)
+        metrics.observe('saanchari_upstream_seconds', elapsed, upstream=self.name, language=language)
+        if error is None:
+            self.breaker.record_success()
+            self._count('successes', language=language)
+        else:
+            self.breaker.record_failure()
+            self._count('failures', language=language)
+
+    def call(self, fn, *args, max_attempts=None, retry_if=None, metric_language=None, deadline=None, **kwargs):
+        """
+        Call ``fn`` with rate limiting, retries and circuit breaking.
+
+        ``retry_if`` may flag a returned value as unusable, in which case it is
+        retried like an error; the last value is returned if no attempt is
+        acceptable. Exceptions from the final attempt are re-raised.
+        With a ``deadline`` (a time.perf_counter() value), no retry or
+        rate-limit wait is started that would end past it; the last error or
+        value is returned as if it were the final attempt.
+        """
+        attempts = max_attempts or self.max_attempts
+        result = None
+        delay = 0.0
+        for attempt in range(attempts):
+            if attempt > 0:
+                self._count('retries', language=metric_language)
+                time.sleep(delay)
+            wait = self._admit(metric_language)
+            while wait > 0:
+                self._wait_allowed(wait, deadline, metric_language)
+                time.sleep(wait)
+                wait = self.bucket.try_acquire()
+            self._count('calls', language=metric_language)
+            started = time.perf_counter()
+            delay = self._backoff(attempt + 1)
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                self._finish(started, e, metric_language)
+                if attempt == attempts - 1 or self._out_of_time(deadline, delay):
+                    raise
+                print(f"{self.name} call failed (attempt {attempt + 1}/{attempts}): {e}")
+                continue
+            self._finish(started, language=metric_language)
+            if retry_if is None or not retry_if(result) or self._out_of_time(deadline, delay):
+                return result
+        return result
+
+    async def call_async(self, fn, *args, max_attempts=None, metric_language=None, deadline=None, **kwargs):
+        """Async version of call() for coroutine functions; sleeps never block a thread."""
+        attempts = max_attempts or self.max_attempts
+        delay = 0.0
+        for attempt in range(attempts):
+            if attempt > 0:
+                self._count('retries', language=metric_language)
+                await asyncio.sleep(delay)
+            wait = self._admit(metric_language)
+            while wait > 0:
+                self._wait_allowed(wait, deadline, metric_language)
+                await asyncio.sleep(wait)
+                wait = self.bucket.try_acquire()
+            self._count('calls', language=metric_language)
+            started = time.perf_counter()
+            delay = self._backoff(attempt + 1)
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                self._finish(started, e, metric_language)
+                if attempt == attempts - 1 or self._out_of_time(deadline, delay):
+                    raise
+                print(f"{self.name} call failed (attempt {attempt + 1}/{attempts}): {e}")
+                continue
+            self._finish(started, language=metric_language)
+            return result
+
+    def stats(self):
+        """Return call counters, breaker state and latency percentiles."""
+        with self._lock:
+            stats = dict(self.counters)
+        latencies = sorted(self.latencies)
+        if latencies:
+            stats['latency_p50'] = latencies[int(0.50 * (len(latencies) - 1))]
+            stats['latency_p95'] = latencies[int(0.95 * (len(latencies) - 1))]
+        stats['breaker'] = self.breaker.state
+        return stats
+
+class SingleFlight:
+    """
+    Share one in-flight upstream call between concurrent callers with the same key.
+
+    The first caller for a key (the leader) makes the call; callers arriving
+    while it is running wait for it and get the same result or exception.
+    Nothing is remembered once the call finishes; that is what the caches
+    are for. ``do``, ``do_async`` and ``stream`` keep separate flights, so
+    the same key can be in flight in each style at once.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.leaders = 0
+        self.shared = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key, new_flight):
+        """Return (flight, is_leader), registering ``new_flight()`` if none is running."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = new_flight()
+                self.leaders += 1
+                return flight, True
+            self.shared += 1
+        metrics.inc('saanchari_coalesced_total', flight=self.name)
+        return flight, False
+
+    def _land(self, key, flight):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def do(self, key, fn, *args, **kwargs):
+        """Call ``fn(*args, **kwargs)``, or wait for an identical call already in flight."""
+        key = ('do', key)
+        flight, leader = self._join(key, lambda: {'done': threading.Event(), 'result': None, 'error': None})
+        if not leader:
+            flight['done'].wait()
+            if flight['error'] is not None:
+                raise flight['error']
+            return flight['result']
+        try:
+            flight['result'] = fn(*args, **kwargs)
+            return flight['result']
+        except BaseException as e:
+            flight['error'] = e
+            raise
+        finally:
+            self._land(key, flight)
+            flight['done'].set()
+
+    async def do_async(self, key, fn, *args, **kwargs):
+        """
+        Await ``fn(*args, **kwargs)``, or an identical call already in flight.
+
+        The call runs in its own task that every caller awaits through
+        ``asyncio.shield``, so one caller being cancelled does not cancel it
+        for the others. The task is cancelled once no caller is waiting.
+        """
+        loop = asyncio.get_running_loop()
+        # Tasks belong to one event loop, so flights are per loop too
+        key = ('do_async', id(loop), key)
+        flight, leader = self._join(key, lambda: {'task': None, 'waiters': 0})
+        if leader:
+            # No await between joining and creating the task, so followers
+            # on this loop always find it set
+            flight['task'] = loop.create_task(fn(*args, **kwargs))
+            flight['task'].add_done_callback(lambda _: self._land(key, flight))
+        flight['waiters'] += 1
+        try:
+            return await asyncio.shield(flight['task'])
+        finally:
+            flight['waiters'] -= 1
+            if not flight['waiters'] and not flight['task'].done():
+                # Later callers start a fresh call rather than join a cancelled one
+                self._land(key, flight)
+                flight['task'].cancel()
+
+    def stream(self, key, generator_fn, *args, **kwargs):
+        """
+        Iterate ``generator_fn(*args, **kwargs)``, sharing one run between callers.
+
+        The leader's generator is drained on a background thread so that one
+        caller going away does not cut the stream short for the others. Every
+        caller sees every item, including those produced before it joined.
+        """
+        def new_flight():
+            return {'items': [], 'finished': False, 'error': None, 'changed': threading.Condition()}
+
+        key = ('stream', key)
+        flight, leader = self._join(key, new_flight)
+        if leader:
+            def produce():
+                try:
+                    for item in generator_fn(*args, **kwargs):
+                        with flight['changed']:
+                            flight['items'].append(item)
+                            flight['changed'].notify_all()
+                except BaseException as e:
+                    flight['error'] = e
+                finally:
+                    self._land(key, flight)
+                    with flight['changed']:
+                        flight['finished'] = True
+                        flight['changed'].notify_all()
+
+            context = contextvars.copy_context()
+            threading.Thread(target=context.run, args=(produce,), daemon=True,
+                             name=f'{self.name}-flight').start()
+
+        seen = 0
+        while True:
+            with flight['changed']:
+                flight['changed'].wait_for(lambda: len(flight['items']) > seen or flight['finished'])
+                items = flight['items'][seen:]
+                finished = flight['finished']
+            for item in items:
+                yield item
+            seen += len(items)
+            if finished and not items:
+                break
+        if flight['error'] is not None:
+            raise flight['error']
+
+    def stats(self):
+        with self._lock:
+            return {'leaders': self.leaders, 'shared': self.shared, 'in_flight': len(self._flights)}
+
+translator_upstream = Upstream(
+    'translator', TRANSLATOR_RATE, TRANSLATOR_BURST,
+    failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT
+)
+
+# Concurrent requests for the same (chunk, language) share one translator call
+translator_flight = SingleFlight('translator')
+
+translation_cache = TranslationCache(
+    max_size=TRANSLATION_CACHE_SIZE,
+    ttl=TRANSLATION_CACHE_TTL,
+    db_path=TRANSLATION_CACHE_DB or None,
+    max_rows=TRANSLATION_CACHE_DB_MAX_ROWS
+)
+
+class TranslationBackend:
+    """
+    Interface for a translation engine: ``translate(text, lang_code)``.
+
+    ``lang_code`` is a LANG_MAP code. ``upstream`` is the Upstream that rate
+    limits and retries calls to a remote service, or None for local engines.
+    Every call is timed into saanchari_translation_backend_seconds.
+    """
+
+    name = 'base'
+    upstream = None
+
+    def translate(self, text, lang_code):
+        started = time.perf_counter()
+        try:
+            return self._translate(text, lang_code)
+        except Exception:
+            metrics.inc('saanchari_translation_backend_errors_total', backend=self.name, language=lang_code)
+            raise
+        finally:
+            metrics.observe(
+                'saanchari_translation_backend_seconds', time.perf_counter() - started,
+                backend=self.name, language=lang_code
+            )
+
+    def _translate(self, text, lang_code):
+        raise NotImplementedError
+
+class GoogleBackend(TranslationBackend):
+    """
+    Google Translate through deep-translator (the original behavior).
+
+    ``translator_class`` defaults to GoogleTranslator, imported on first use;
+    any class called as ``cls(source=..., target=...)`` whose instances have
+    ``translate(text)`` works, e.g. the benchmark fakes.
+    """
+
+    name = 'google'
+
+    def __init__(self, translator_class=None, upstream=None):
+        self.translator_class = translator_class
+        self.upstream = upstream
+
+    def _translate(self, text, lang_code):
+        if self.translator_class is None:
+            from deep_translator import GoogleTranslator
+            self.translator_class = GoogleTranslator
+        return self.translator_class(source='auto', target=lang_code).translate(text)
+
+# NLLB-200 language codes for the LANG_MAP codes
+NLLB_LANGUAGE_CODES = {'en': 'eng_Latn', 'hi': 'hin_Deva', 'te': 'tel_Telu'}
+# The local model translates at most this many characters per sequence
+LOCAL_MODEL_MAX_CHARS = 400
+
+_local_pipeline = None
+
+def _init_local_worker(model_name):
+    """Load the translation model once per worker process."""
+    global _local_pipeline
+    from transformers import pipeline
+    _local_pipeline = pipeline('translation', model=model_name, device=-1)
+
+def _translate_in_worker(text, lang_code):
+    # Translate sentence-sized pieces line by line so the layout survives
+    lines = text.split('\n')
+    pieces = [list(iter_chunks(line, LOCAL_MODEL_MAX_CHARS)) for line in lines]
+    flat = [piece for line_pieces in pieces for piece in line_pieces]
+    if not flat:
+        return text
+    # NLLB needs the source language; like Google's source='auto', tell it
+    # from the script, piece by piece, since a message may mix languages
+    sources = [source_language(piece) for piece in flat]
+    translated = list(flat)
+    for source in set(sources):
+        if source == lang_code:
+            continue
+        indices = [index for index, piece_source in enumerate(sources) if piece_source == source]
+        outputs = _local_pipeline(
+            [flat[index] for index in indices],
+            src_lang=NLLB_LANGUAGE_CODES[source], tgt_lang=NLLB_LANGUAGE_CODES[lang_code], max_length=512
+        )
+        for index, output in zip(indices, outputs):
+            translated[index] = output['translation_text']
+    translated = iter(translated)
+    return '\n'.join(' '.join(next(translated) for _ in line_pieces) for line_pieces in pieces)
+
+class LocalModelBackend(TranslationBackend):
+    """
+    CPU-only translation with a local Hugging Face model (NLLB-200 by default).
+
+    Inference runs in a pool of worker processes, each loading the model once,
+    so translation neither holds the GIL nor needs the network. transformers
+    and the model weights are only needed once the backend is first used.
+    """
+
+    name = 'local'
+
+    def __init__(self, model_name, workers=2, timeout=30.0, max_pending=None):
+        self.model_name = model_name
+        self.workers = workers
+        self.timeout = timeout
+        self._pool = None
+        self._lock = threading.Lock()
+        # Translations queued or running at once. One that timed out keeps its
+        # slot until the worker finishes it, so a stuck pool cannot pile up work.
+        self._slots = threading.BoundedSemaphore(max_pending or 2 * workers)
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                # Spawn rather than fork: the parent is full of threads
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_local_worker,
+                    initargs=(self.model_name,)
+                )
+            return self._pool
+
+    def _discard_pool(self, pool):
+        """Drop a broken pool so the next call starts fresh workers."""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _translate(self, text, lang_code):
+        from concurrent.futures import TimeoutError as FutureTimeoutError
+        from concurrent.futures.process import BrokenProcessPool
+        if lang_code not in NLLB_LANGUAGE_CODES:
+            raise ValueError(f"Unsupported language for the local model: {lang_code}")
+        deadline = time.monotonic() + self.timeout
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"local translation queue still full after {self.timeout:g}s")
+        pool = self._get_pool()
+        future = None
+        try:
+            future = pool.submit(_translate_in_worker, text, lang_code)
+            future.add_done_callback(lambda _: self._slots.release())
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            # Drop it if no worker has picked it up yet; one already running
+            # (e.g. still loading the model) finishes and frees its slot then
+            future.cancel()
+            raise TimeoutError(f"local translation took longer than {self.timeout:g}s")
+        except BrokenProcessPool:
+            # A worker died, e.g. out of memory while loading the model
+            metrics.inc('saanchari_translation_worker_restarts_total', backend=self.name)
+            self._discard_pool(pool)
+            raise
+        finally:
+            if future is None:
+                self._slots.release()
+
+class FakeBackend(TranslationBackend):
+    """Offline stand-in for tests and demos: tags every word with the language code."""
+
+    name = 'fake'
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def _translate(self, text, lang_code):
+        if self.latency:
+            time.sleep(self.latency)
+        return re.sub(r'(?<!\[)\b(\w+)\b(?!\s*\]\])', rf'\1~{lang_code}', text)
+
+def create_translation_backend(name=None):
+    """Build the backend selected by TRANSLATION_BACKEND (google, local or fake)."""
+    name = (name or TRANSLATION_BACKEND).lower()
+    if name == 'google':
+        return GoogleBackend(upstream=translator_upstream)
+    if name == 'local':
+        return LocalModelBackend(
+            TRANSLATION_LOCAL_MODEL, workers=TRANSLATION_LOCAL_WORKERS, timeout=TRANSLATION_LOCAL_TIMEOUT
+        )
+    if name == 'fake':
+        return FakeBackend()
+    raise ValueError(f"Unknown TRANSLATION_BACKEND: {name!r} (expected google, local or fake)")
+
+_translation_backend = None
+_translation_backend_lock = threading.Lock()
+
+def get_translation_backend():
+    """Return the configured translation backend, creating it on first use."""
+    global _translation_backend
+    if _translation_backend is None:
+        with _translation_backend_lock:
+            if _translation_backend is None:
+                _translation_backend = create_translation_backend()
+    return _translation_backend
+
+# Chunks and whole messages run on separate pools: message tasks wait on chunk
+# tasks, so sharing one pool could deadlock once every worker is a message.
+_translation_slots = threading.BoundedSemaphore(TRANSLATION_CONCURRENCY)
+_chunk_executor = ContextThreadPoolExecutor(
+    max_workers=TRANSLATION_CONCURRENCY, thread_name_prefix='translate-chunk'
+)
+_message_executor = ContextThreadPoolExecutor(
+    max_workers=TRANSLATION_MESSAGE_WORKERS, thread_name_prefix='translate-message'
+)
+
+def translate_chunk(chunk, lang_code, max_retries=3, use_cache=True):
+    """
+    Translate a single chunk, falling back to the original text on failure.
+
+    Args:
+        chunk: The chunk of text to translate
+        lang_code: Target language code from LANG_MAP
+        max_retries: Number of retry attempts for failed translations
+        use_cache: Whether to read and fill the translation cache
+
+    Returns:
+        The translated chunk, or the original chunk if it needs no
+        translation or every attempt failed
+    """
+    if skip_translation(chunk, lang_code):
+        return chunk
+    if CODE_SEGMENT.search(chunk):
+        return _translate_around_code(chunk, lang_code, max_retries, use_cache)
+
+    # Reuse an earlier translation of the same chunk if we have one
+    if use_cache:
+        cached = translation_cache.get(chunk, lang_code)
+        if cached is not None:
+            return cached
+
+    backend = get_translation_backend()
+
+    def translate():
+        with _translation_slots:
+            return backend.translate(chunk, lang_code)
+
+    try:
+        key = (normalize_text(chunk), lang_code)
+        with timed('translate_chunk', language=lang_code):
+            if backend.upstream is None:
+                # Local engines need no rate limiting or network retries
+                translated = translator_flight.do(key, translate)
+            else:
+                translated = translator_flight.do(
+                    key,
+                    backend.upstream.call,
+                    translate,
+                    max_attempts=max_retries,
+                    retry_if=lambda result: not result or result == chunk,
+                    metric_language=lang_code
+                )
+        if translated and translated != chunk:  # Only accept if translation succeeded
+            if use_cache:
+                translation_cache.set(chunk, lang_code, translated)
+            return translated
+    except Exception as e:
+        print(f"Translation error: {str(e)}")
+        record_error('translate_chunk')
+
+    # Add original chunk if translation fails
+    metrics.inc('saanchari_translation_fallbacks_total', kind='chunk', language=lang_code)
+    return chunk
+
+def _translate_around_code(chunk, lang_code, max_retries=3, use_cache=True):
+    """Translate the prose of a chunk, keeping its code and links as they are."""
+    # With the capturing group, odd positions hold the code segments
+    parts = CODE_SEGMENT.split(chunk)
+    for index in range(0, len(parts), 2):
+        prose = parts[index].strip()
+        if prose:
+            translated = translate_chunk(prose, lang_code, max_retries, use_cache)
+            parts[index] = parts[index].replace(prose, translated, 1)
+    return ''.join(parts)
+
 def translate_text(text, target_lang, is_user_message=False, max_retries=3):
     """
     Unified translation function that handles both single messages and chat history.
@@ -44,45 +1237,27 @@ def translate_text(text, target_lang, is_user_message=False, max_retries=3):
         
         # Get the appropriate language code and prefix
         lang_code = get_translator(target_lang)
-        prefix = ""
-        
-        if target_lang == "Hindi":
-            prefix = "[हिंदी] "
-        elif target_lang == "Telugu":
-            prefix = "[తెలుగు] "
+        prefix = LANG_PREFIX.get(target_lang, "")
             
         if lang_code == 'en':
             return clean_text
             
-        # Split text into chunks for translation if needed
-        chunks = split_into_chunks(clean_text, max_chunk_size=15000)
-        if not chunks:
+        # Split text into chunks for translation if needed; chunks are produced lazily
+        chunks = (chunk for chunk in iter_chunks(clean_text, max_chunk_size=15000) if chunk.strip())
+        first_chunk = next(chunks, None)
+        if first_chunk is None:
             return clean_text
-            
-        translated_chunks = []
-        
-        for chunk in chunks:
-            if not chunk.strip():
-                continue
-                
-            for attempt in range(max_retries):
-                try:
-                    # Add a small delay between chunks to avoid rate limiting
-                    if attempt > 0:
-                        import time
-                        time.sleep(1)
-                        
-                    # Translate using deep-translator
-                    translated = GoogleTranslator(source='auto', target=lang_code).translate(chunk)
-                    if translated and translated != chunk:  # Only append if translation succeeded
-                        translated_chunks.append(translated)
-                        break
-                    elif attempt == max_retries - 1:  # If all retries failed
-                        translated_chunks.append(chunk)  # Add original chunk if translation fails
-                except Exception as e:
-                    print(f"Translation error: {str(e)}")
-                    if attempt == max_retries - 1:  # If all retries failed
-                        translated_chunks.append(chunk)  # Add original chunk if translation fails
+        second_chunk = next(chunks, None)
+
+        if second_chunk is None:
+            translated_chunks = [translate_chunk(first_chunk, lang_code, max_retries)]
+        else:
+            # Each chunk starts translating as soon as it is cut; results keep their order
+            futures = [
+                _chunk_executor.submit(translate_chunk, chunk, lang_code, max_retries)
+                for chunk in (first_chunk, second_chunk, *chunks)
+            ]
+            translated_chunks = [future.result() for future in futures]
         
         # Join chunks and clean up the result
         result = ' '.join(translated_chunks).strip()
@@ -94,79 +1269,311 @@ def translate_text(text, target_lang, is_user_message=False, max_retries=3):
         
     except Exception as e:
         print(f"Unexpected error in translate_text: {e}")
+        record_error('translate_text')
         return text.strip() if text else ""
 
-def split_into_chunks(text, max_chunk_size=15000):  # Increased chunk size for googletrans
-    """Split text into chunks of maximum size, trying to break at sentence boundaries."""
-    if not text:
-        return []
+async def translate_text_async(text, target_lang, is_user_message=False, max_retries=3):
+    """Async wrapper around translate_text that runs on the message translation pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _message_executor,
+        functools.partial(translate_text, text, target_lang, is_user_message, max_retries)
+    )
+
+# Numbered markers that separate messages packed into one translator request
+BATCH_MARKER = re.compile(r'\[\[\s*(\d+)\s*\]\]')
+
+def _translate_packed(texts, lang_code, max_retries=3):
+    """
+    Translate several texts in one request and split the result back out.
+
+    Returns the list of translations, or None if the request failed or the
+    markers did not survive translation intact.
+    """
+    packed = "\n".join(f"[[{index}]] {text}" for index, text in enumerate(texts))
+    translated = translate_chunk(packed, lang_code, max_retries, use_cache=False)
+    if translated == packed:
+        return None
+    
+    parts = BATCH_MARKER.split(translated)
+    # parts looks like [leading, "0", text0, "1", text1, ...]
+    if parts[0].strip() or len(parts) != 2 * len(texts) + 1:
+        return None
+    indices = [int(index) for index in parts[1::2]]
+    if indices != list(range(len(texts))):
+        return None
+    results = [part.strip() for part in parts[2::2]]
+    if not all(results):
+        return None
+    return results
+
+def translate_batch(texts, target_lang, max_batch_chars=None, max_retries=3):
+    """
+    Translate many short messages with as few translator requests as possible.
+
+    Messages are packed, in order, into marker-separated requests of up to
+    ``max_batch_chars`` characters and split back apart afterwards. If the
+    markers come back mangled, that batch falls back to one translate_text
+    call per message. Messages that are too long to pack go through
+    translate_text directly, as do all messages for local backends, which
+    have no round trip to save and would not keep the markers. Messages
+    already in the target script are not sent at all.
+    
+    Args:
+        texts: Messages to translate
+        target_lang: Target language ("Hindi", "Telugu", or "English")
+        max_batch_chars: Character budget per request (TRANSLATION_BATCH_CHARS)
+        max_retries: Number of retry attempts for failed translations
+        
+    Returns:
+        Translated messages with language prefixes, in the same order as texts
+    """
+    max_batch_chars = max_batch_chars or TRANSLATION_BATCH_CHARS
+    lang_code = get_translator(target_lang)
+    prefix = LANG_PREFIX.get(target_lang, "")
+    results = [None] * len(texts)
+    batches = []
+    current, current_size = [], 0
+    singles = []
+    pack = get_translation_backend().upstream is not None
+    # Identical messages (e.g. repeated questions) are only sent once
+    duplicates = {}
+    
+    for index, text in enumerate(texts):
+        text = str(text) if text is not None else ""
+        # Same skip rules as translate_text
+        if (not text.strip() or lang_code == 'en' or len(text.strip()) < 2
+                or any(marker in text for marker in ["[हिंदी]", "[తెలుగు]"])):
+            results[index] = text.strip()
+            continue
+        
+        clean_text = text.strip()
+        # Already in the target script: nothing to send
+        if skip_translation(clean_text, lang_code):
+            results[index] = f"{prefix}{clean_text}"
+            continue
+        
+        cached = translation_cache.get(clean_text, lang_code)
+        if cached is not None:
+            results[index] = f"{prefix}{cached}"
+            continue
         
-    # Try to split at sentence boundaries first
-    sentences = re.split(r'(?<=[.!?])\s+', text)
+        if clean_text in duplicates:
+            duplicates[clean_text][1].append(index)
+            continue
+        duplicates[clean_text] = (index, [])
+        size = len(clean_text) + len(f"[[{index}]] \n")
+        # Code has to be kept out of the request, so those messages go alone
+        if size > max_batch_chars or not pack or CODE_SEGMENT.search(clean_text):
+            singles.append(index)
+            continue
+        if current and current_size + size > max_batch_chars:
+            batches.append(current)
+            current, current_size = [], 0
+        current.append((index, clean_text))
+        current_size += size
+    if current:
+        batches.append(current)
     
-    chunks = []
-    current_chunk = []
-    current_length = 0
+    batch_futures = [
+        (batch, _chunk_executor.submit(
+            _translate_packed, [text for _, text in batch], lang_code, max_retries
+        ))
+        for batch in batches
+    ]
+    fallback_futures = [
+        (index, _message_executor.submit(translate_text, texts[index], target_lang, False, max_retries))
+        for index in singles
+    ]
     
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if not sentence:
+    for batch, future in batch_futures:
+        translated = future.result()
+        if translated is None:
+            # Markers were mangled or the request failed: translate one by one
+            metrics.inc('saanchari_translation_fallbacks_total', kind='batch', language=lang_code)
+            fallback_futures.extend(
+                (index, _message_executor.submit(translate_text, text, target_lang, False, max_retries))
+                for index, text in batch
+            )
             continue
-            
-        # If a single sentence is too long, we need to split it
-        if len(sentence) > max_chunk_size:
-            # Split by words if the sentence is too long
-            words = sentence.split(' ')
-            temp_chunk = []
-            temp_length = 0
-            
-            for word in words:
-                if temp_length + len(word) + 1 > max_chunk_size and temp_chunk:
-                    chunks.append(' '.join(temp_chunk))
-                    temp_chunk = [word]
-                    temp_length = len(word)
-                else:
-                    temp_chunk.append(word)
-                    temp_length += len(word) + 1
-            
-            if temp_chunk:
-                if current_chunk and (current_length + len(' '.join(temp_chunk)) + 1) <= max_chunk_size:
-                    current_chunk.extend(temp_chunk)
-                    current_length += len(' '.join(temp_chunk)) + 1
-                else:
-                    if current_chunk:
-                        chunks.append(' '.join(current_chunk))
-                    current_chunk = temp_chunk
-                    current_length = len(' '.join(temp_chunk))
-        else:
-            if current_chunk and (current_length + len(sentence) + 1) > max_chunk_size:
-                chunks.append(' '.join(current_chunk))
-                current_chunk = [sentence]
-                current_length = len(sentence)
+        for (index, text), translated_text in zip(batch, translated):
+            translation_cache.set(text, lang_code, translated_text)
+            results[index] = f"{prefix}{translated_text}"
+    
+    for index, future in fallback_futures:
+        results[index] = future.result()
+    
+    for first, copies in duplicates.values():
+        for index in copies:
+            results[index] = results[first]
+    
+    return results
+
+def iter_sentences_in(text):
+    """Lazily yield the stripped, non-empty sentences of a text."""
+    start = 0
+    for boundary in SENTENCE_BOUNDARY.finditer(text):
+        sentence = text[start:boundary.start()].strip()
+        if sentence:
+            yield sentence
+        start = boundary.end()
+    sentence = text[start:].strip()
+    if sentence:
+        yield sentence
+
+def iter_chunks(text, max_chunk_size=15000, unit='chars'):
+    """
+    Lazily split text into chunks of at most ``max_chunk_size``, breaking at sentence boundaries.
+
+    Works in a single pass: sentences are packed into the current chunk
+    (joined by single spaces) while they fit, and sentences that are too long
+    on their own are packed word by word. Lengths are tracked exactly, so a
+    chunk only exceeds the budget if one word does.
+
+    Args:
+        text: The text to split
+        max_chunk_size: Budget per chunk
+        unit: 'chars' to count characters, 'bytes' to count UTF-8 bytes
+    """
+    if not text:
+        return
+    if unit == 'bytes':
+        measure = lambda piece: len(piece.encode('utf-8'))
+    else:
+        measure = len
+    
+    parts = []
+    length = 0
+    
+    def pieces():
+        for sentence in iter_sentences_in(text):
+            size = measure(sentence)
+            if size <= max_chunk_size:
+                yield sentence, size
             else:
-                current_chunk.append(sentence)
-                current_length += len(sentence) + 1
+                # Split by words if the sentence is too long
+                for word in sentence.split(' '):
+                    if word:
+                        yield word, measure(word)
     
-    if current_chunk:
-        chunks.append(' '.join(current_chunk))
+    for piece, size in pieces():
+        if parts and length + 1 + size > max_chunk_size:
+            yield ' '.join(parts)
+            parts = []
+            length = 0
+        length += size + (1 if parts else 0)
+        parts.append(piece)
     
-    return chunks
+    if parts:
+        yield ' '.join(parts)
 
-# Load environment variables from .env file if it exists (for local development)
-load_dotenv()
+def split_into_chunks(text, max_chunk_size=15000, unit='chars'):  # Increased chunk size for googletrans
+    """Split text into chunks of maximum size, trying to break at sentence boundaries."""
+    return list(iter_chunks(text, max_chunk_size, unit))
 
-# Initialize Gemini
+# Gemini is configured lazily on first use so importing this module is cheap
+# and does not require GEMINI_API_KEY
 API_KEY = os.getenv('GEMINI_API_KEY')
-if not API_KEY:
-    raise ValueError("GEMINI_API_KEY environment variable not set. "
-                    "Please set it in the Hugging Face Space secrets.")
 
-genai.configure(api_key=API_KEY)
-model = genai.GenerativeModel("models/gemini-1.5-flash")
+# A model installed with configure_backends; used for every language
+_model = None
+# Optional replacement for genai model creation: factory(system_instruction)
+_model_factory = None
+# Models created per system instruction: instruction -> (model, expires_at)
+_models = {}
+_model_lock = threading.Lock()
 
-# System prompt for the travel assistant
-SYSTEM_PROMPT = """
-You are a friendly, expert travel planner specializing in India, with special focus on Andhra Pradesh tourism. 
+def check_api_key():
+    """Raise if GEMINI_API_KEY is missing."""
+    if not API_KEY:
+        raise ValueError("GEMINI_API_KEY environment variable not set. "
+                        "Please set it in the Hugging Face Space secrets.")
+
+def prompt_mode():
+    """How the system prompt reaches Gemini: inline, system_instruction or cached_content."""
+    if not GEMINI_SYSTEM_INSTRUCTION:
+        return 'inline'
+    return 'cached_content' if GEMINI_CACHED_CONTENT else 'system_instruction'
+
+def _create_model(system_instruction):
+    """Create a Gemini model, returning (model, expires_at)."""
+    if _model_factory is not None:
+        return _model_factory(system_instruction), math.inf
+    check_api_key()
+    import google.generativeai as genai
+    genai.configure(api_key=API_KEY)
+    if system_instruction is None:
+        return genai.GenerativeModel(GEMINI_MODEL_NAME), math.inf
+    if GEMINI_CACHED_CONTENT:
+        try:
+            import datetime
+            cached = genai.caching.CachedContent.create(
+                model=GEMINI_MODEL_NAME,
+                system_instruction=system_instruction,
+                ttl=datetime.timedelta(seconds=GEMINI_CACHE_TTL)
+            )
+            # Recreate the model a little before the cache expires
+            return genai.GenerativeModel.from_cached_content(cached), time.monotonic() + 0.9 * GEMINI_CACHE_TTL
+        except Exception as e:
+            print(f"Error creating cached content, sending the system instruction instead: {e}")
+            record_error('gemini_cached_content')
+    return genai.GenerativeModel(GEMINI_MODEL_NAME, system_instruction=system_instruction), math.inf
+
+def get_model(language='English'):
+    """
+    Return the Gemini model for a chat language, creating it on first use.
+
+    With GEMINI_SYSTEM_INSTRUCTION each distinct system prompt from the
+    prompt registry gets its own model; languages sharing a prompt share it.
+    """
+    if _model is not None:
+        return _model
+    system_instruction = prompt_registry.get(language) if GEMINI_SYSTEM_INSTRUCTION else None
+    entry = _models.get(system_instruction)
+    if entry is None or time.monotonic() >= entry[1]:
+        with _model_lock:
+            entry = _models.get(system_instruction)
+            if entry is None or time.monotonic() >= entry[1]:
+                entry = _models[system_instruction] = _create_model(system_instruction)
+    return entry[0]
+
+def configure_backends(model=None, translator_class=None, translation_backend=None, model_factory=None):
+    """
+    Swap in alternative Gemini/translator backends (e.g. offline fakes for benchmarks).
+
+    ``model`` must provide generate_content/generate_content_async like
+    genai.GenerativeModel and is used for every language. ``model_factory``
+    is instead called with each system instruction (or None) in place of
+    creating a genai model, so prompt handling is exercised as in production.
+    ``translator_class`` is called like GoogleTranslator(source=...,
+    target=...) and must return an object with translate(text); it is used
+    through GoogleBackend, with the usual rate limits.
+    ``translation_backend`` replaces the backend outright.
+    """
+    global _model, _model_factory, _translation_backend
+    if model is not None:
+        _model = model
+    if model_factory is not None:
+        _model_factory = model_factory
+        _models.clear()
+    if translator_class is not None:
+        _translation_backend = GoogleBackend(translator_class, upstream=translator_upstream)
+    if translation_backend is not None:
+        _translation_backend = translation_backend
+
+gemini_upstream = Upstream(
+    'gemini', GEMINI_RATE, GEMINI_BURST, max_attempts=GEMINI_MAX_ATTEMPTS,
+    base_delay=0.5, max_delay=8.0,
+    failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT
+)
+
+# Concurrent identical prompts (e.g. an example question clicked by many
+# users at once) share one Gemini call
+gemini_flight = SingleFlight('gemini')
+
+# System prompt for the travel assistant
+SYSTEM_PROMPT = """
+You are a friendly, expert travel planner specializing in India, with special focus on Andhra Pradesh tourism. 
 You help travelers plan amazing trips with personalized, user-friendly answers.
 Your capabilities include:
 - Suggesting best times to visit
@@ -181,23 +1588,749 @@ Always adapt the level of detail based on the user's question.
 If the question is about Andhra Pradesh, include local details about places, food, festivals, and crafts.
 """
 
-def get_gemini_response(user_input):
-    """Get response from Gemini model."""
+class PromptRegistry:
+    """
+    System prompts per chat language, falling back to a default.
+
+    Templates may contain ``{base}``, which is replaced by the default prompt,
+    so a language can extend the shared instructions rather than repeat them.
+    """
+
+    def __init__(self, default):
+        self.default = default
+        self._templates = {}
+
+    def register(self, language, template):
+        self._templates[language] = template.replace('{base}', self.default)
+
+    def load(self, path):
+        """Register every ``{language: template}`` pair from a JSON file."""
+        with open(path, encoding='utf-8') as templates_file:
+            for language, template in json.load(templates_file).items():
+                self.register(language, template)
+
+    def get(self, language):
+        return self._templates.get(language, self.default)
+
+    def uses_default(self, language):
+        return self.get(language) == self.default
+
+prompt_registry = PromptRegistry(SYSTEM_PROMPT)
+if PROMPT_TEMPLATES_FILE:
     try:
-        prompt = f"{SYSTEM_PROMPT}\n\nUser's Question: {user_input}"
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        prompt_registry.load(PROMPT_TEMPLATES_FILE)
+    except (OSError, ValueError, AttributeError) as e:
+        print(f"Error loading prompt templates: {e}")
+
+def normalize_question(text):
+    """
+    Lowercase a question and drop punctuation so trivial variants match.
+
+    Only punctuation and symbols (Unicode categories P* and S*) are dropped;
+    ``\w`` would also drop the vowel signs and viramas of Devanagari and
+    Telugu, which are combining marks.
+    """
+    return ' '.join(''.join(
+        ' ' if unicodedata.category(char)[0] in 'PS' else char for char in text.lower()
+    ).split())
+
+# Filler words that carry no meaning for matching tourism questions
+QUESTION_STOPWORDS = frozenset(
+    "a an the what which is are was were can could should would i we me my "
+    "you your please tell some any about of in on for to do does there".split()
+)
+
+# Words that flip or narrow a question's meaning; similar questions only
+# match when they use the same ones in the same order ("with kids" vs
+# "without kids", "in Visakhapatnam" vs "near Visakhapatnam")
+QUESTION_GUARD_WORDS = frozenset(
+    "not no non never without except with in near nearby around from to via before after during "
+    "under over above below between inside outside within beyond".split()
+)
+# Contractions lose their apostrophe in normalize_question ("isn't" -> "isn t")
+QUESTION_NEGATIONS = frozenset("not no never t nt".split())
+
+def question_guard(text):
+    """The guard words of a normalized question, in order, with negations unified."""
+    return [
+        'not' if word in QUESTION_NEGATIONS else word
+        for word in text.split() if word in QUESTION_GUARD_WORDS or word in QUESTION_NEGATIONS
+    ]
+
+def question_words(text):
+    """
+    The content words of a normalized non-Latin question, or None for Latin ones.
+
+    The stopwords and guard words only cover English, so similar Hindi and
+    Telugu questions must use the same set of words.
+    """
+    if text.isascii():
+        return None
+    return frozenset(word for word in text.split() if word not in QUESTION_STOPWORDS)
+
+def ngram_vector(text, n=3):
+    """Character n-gram counts of a normalized question, padded at word edges."""
+    words = [word for word in text.split() if word not in QUESTION_STOPWORDS] or text.split()
+    padded = f" {' '.join(words)} "
+    return Counter(padded[i:i + n] for i in range(max(len(padded) - n + 1, 1)))
+
+class ResponseCache:
+    """
+    Cache of Gemini answers placed in front of get_gemini_response.
+
+    Lookups first try an exact match on the normalized question, then the
+    most similar cached question by cosine similarity of character n-gram
+    vectors. A similar hit is only used at or above ``threshold`` and when
+    both questions mention the same numbers ("3-day" vs "5-day") and the
+    same QUESTION_GUARD_WORDS ("with kids" vs "without kids"); non-Latin
+    questions must also use the same words (see question_words). Entries
+    expire after ``ttl`` seconds and the least recently used are evicted
+    beyond ``max_size``.
+    """
+
+    def __init__(self, max_size=512, ttl=24 * 3600, threshold=0.9):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.threshold = threshold
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expired(self, created):
+        return self.ttl is not None and self.ttl > 0 and time.time() - created > self.ttl
+
+    @staticmethod
+    def _cosine(a, a_norm, b, b_norm):
+        if not a_norm or not b_norm:
+            return 0.0
+        if len(a) > len(b):
+            a, b = b, a
+        return sum(count * b.get(gram, 0) for gram, count in a.items()) / (a_norm * b_norm)
+
+    def get(self, question, language='en'):
+        """
+        Return a cached answer for the question (or a close variant) or None.
+
+        Answers are cached in English; ``language`` is the code of the session
+        asking, for the lookup metrics.
+        """
+        key = normalize_question(question)
+        if not key:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not self._expired(entry['created']):
+                    self._entries.move_to_end(key)
+                    self.exact_hits += 1
+                    metrics.inc('saanchari_cache_lookups_total', cache='response', result='hit', language=language)
+                    return entry['response']
+                del self._entries[key]
+
+            vector = ngram_vector(key)
+            norm = math.sqrt(sum(count * count for count in vector.values()))
+            numbers = re.findall(r'\d+', key)
+            guard = question_guard(key)
+            words = question_words(key)
+            best_key, best_score = None, 0.0
+            for cached_key, cached in list(self._entries.items()):
+                if self._expired(cached['created']):
+                    del self._entries[cached_key]
+                    continue
+                if cached['numbers'] != numbers or cached['guard'] != guard or cached['words'] != words:
+                    continue
+                score = self._cosine(vector, norm, cached['vector'], cached['norm'])
+                if score > best_score:
+                    best_key, best_score = cached_key, score
+
+            if best_key is not None and best_score >= self.threshold:
+                self._entries.move_to_end(best_key)
+                self.similar_hits += 1
+                metrics.inc('saanchari_cache_lookups_total', cache='response', result='similar_hit', language=language)
+                return self._entries[best_key]['response']
+
+            self.misses += 1
+            metrics.inc('saanchari_cache_lookups_total', cache='response', result='miss', language=language)
+            return None
+
+    def set(self, question, response):
+        """Cache an answer for a question."""
+        key = normalize_question(question)
+        if not key or not response:
+            return
+        vector = ngram_vector(key)
+        with self._lock:
+            self._entries[key] = {
+                'response': response,
+                'created': time.time(),
+                'vector': vector,
+                'norm': math.sqrt(sum(count * count for count in vector.values())),
+                'numbers': re.findall(r'\d+', key),
+                'guard': question_guard(key),
+                'words': question_words(key),
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def prewarm(self, questions, responder=None):
+        """Answer each question once (via get_gemini_response by default) and cache it."""
+        responder = responder or get_gemini_response
+        for question in questions:
+            if self.get(question) is None:
+                responder(question)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.exact_hits = self.similar_hits = self.misses = 0
+
+    def stats(self):
+        """Return hit/miss counters for monitoring."""
+        with self._lock:
+            hits = self.exact_hits + self.similar_hits
+            lookups = hits + self.misses
+            return {
+                'exact_hits': self.exact_hits,
+                'similar_hits': self.similar_hits,
+                'misses': self.misses,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+            }
+
+response_cache = ResponseCache(
+    max_size=RESPONSE_CACHE_SIZE,
+    ttl=RESPONSE_CACHE_TTL,
+    threshold=RESPONSE_CACHE_THRESHOLD
+)
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token) without an API call."""
+    return (len(text) + 3) // 4 if text else 0
+
+def history_pairs(chat_history):
+    """Return (user, bot) English pairs from ChatTurn records or a Chatbot value."""
+    pairs = []
+    for turn in chat_history or []:
+        if isinstance(turn, ChatTurn):
+            user_msg, bot_msg = turn.user, turn.bot
+        elif isinstance(turn, (list, tuple)) and len(turn) >= 2:
+            user_msg = strip_language_prefixes(turn[0]) if turn[0] is not None else ""
+            bot_msg = strip_language_prefixes(turn[1]) if turn[1] is not None else ""
+        else:
+            continue
+        if user_msg and bot_msg:
+            pairs.append((user_msg, bot_msg))
+    return pairs
+
+def summarize_turn(user_msg, bot_msg, max_chars=160):
+    """One-line extractive summary of an older turn: the question and the answer's lead."""
+    lead = SENTENCE_BOUNDARY.split(' '.join(bot_msg.split()), maxsplit=1)[0]
+    if len(lead) > max_chars:
+        lead = lead[:max_chars].rsplit(' ', 1)[0] + "..."
+    return f"- User asked: {' '.join(user_msg.split())} | You answered: {lead}"
+
+def build_conversation_context(chat_history, token_budget=None, recent_turns=None):
+    """
+    Build the conversation context sent ahead of the current question.
+
+    The newest ``recent_turns`` turns are included verbatim and older turns as
+    one-line summaries, newest first, until ``token_budget`` is used up.
+
+    Returns:
+        (context_text, info) where info holds the token estimate and how many
+        turns were kept verbatim, summarized or dropped
+    """
+    token_budget = CONTEXT_TOKEN_BUDGET if token_budget is None else token_budget
+    recent_turns = CONTEXT_RECENT_TURNS if recent_turns is None else recent_turns
+    pairs = history_pairs(chat_history)
+    
+    remaining = token_budget
+    recent = []
+    summaries = []
+    index = len(pairs)
+    
+    # Walk backwards: verbatim for the newest turns, summaries after that
+    while index > 0 and remaining > 0:
+        index -= 1
+        user_msg, bot_msg = pairs[index]
+        if len(recent) < recent_turns and not summaries:
+            entry = f"User: {user_msg}\nAssistant: {bot_msg}"
+            cost = estimate_tokens(entry)
+            if cost <= remaining:
+                recent.insert(0, entry)
+                remaining -= cost
+                continue
+        entry = summarize_turn(user_msg, bot_msg)
+        cost = estimate_tokens(entry)
+        if cost > remaining:
+            index += 1
+            break
+        summaries.insert(0, entry)
+        remaining -= cost
+    
+    sections = []
+    if summaries:
+        sections.append("Earlier in this conversation:\n" + "\n".join(summaries))
+    if recent:
+        sections.append("Recent conversation:\n" + "\n\n".join(recent))
+    context = "\n\n".join(sections)
+    
+    info = {
+        'context_tokens': token_budget - remaining,
+        'verbatim_turns': len(recent),
+        'summarized_turns': len(summaries),
+        'dropped_turns': index,
+    }
+    return context, info
+
+# Recent per-request prompt size reports (see build_prompt)
+prompt_stats = deque(maxlen=1000)
+
+# Recent per-call Gemini usage: prompt mode, input/cached/output tokens, seconds
+gemini_usage = deque(maxlen=1000)
+
+def build_prompt(user_input, chat_history=None, language='English'):
+    """
+    Assemble the Gemini prompt and record its estimated size.
+
+    The system prompt is only included here when it is not already set on
+    the model (GEMINI_SYSTEM_INSTRUCTION off).
+    """
+    context, info = build_conversation_context(chat_history)
+    parts = [] if GEMINI_SYSTEM_INSTRUCTION else [prompt_registry.get(language)]
+    if context:
+        parts.append(context)
+    parts.append(f"User's Question: {user_input}")
+    prompt = "\n\n".join(parts)
+    info['prompt_tokens'] = estimate_tokens(prompt)
+    info['system_tokens'] = estimate_tokens(prompt_registry.get(language))
+    prompt_stats.append(info)
+    if LOG_PROMPT_SIZE:
+        print(
+            f"Prompt size: ~{info['prompt_tokens']} tokens "
+            f"({info['verbatim_turns']} verbatim, {info['summarized_turns']} summarized, "
+            f"{info['dropped_turns']} dropped turns; system prompt ~{info['system_tokens']} tokens, "
+            f"{prompt_mode()})"
+        )
+    return prompt
+
+def gemini_flight_key(prompt, language):
+    """Single-flight key: identical prompts under the same system prompt."""
+    return prompt_registry.get(language), normalize_question(prompt)
+
+def record_gemini_usage(response, seconds, language=None):
+    """Record the input, cached and output tokens Gemini reported for one call."""
+    usage = getattr(response, 'usage_metadata', None)
+    prompt_tokens = getattr(usage, 'prompt_token_count', 0) or 0
+    cached_tokens = getattr(usage, 'cached_content_token_count', 0) or 0
+    output_tokens = getattr(usage, 'candidates_token_count', 0) or 0
+    mode = prompt_mode()
+    metrics.inc('saanchari_gemini_input_tokens_total', prompt_tokens - cached_tokens,
+                mode=mode, kind='uncached', language=language)
+    metrics.inc('saanchari_gemini_input_tokens_total', cached_tokens, mode=mode, kind='cached', language=language)
+    metrics.inc('saanchari_gemini_output_tokens_total', output_tokens, mode=mode, language=language)
+    gemini_usage.append({
+        'mode': mode,
+        'language': language,
+        'prompt_tokens': prompt_tokens,
+        'cached_tokens': cached_tokens,
+        'output_tokens': output_tokens,
+        'seconds': seconds,
+    })
+
+# Generation budget per query class: output token cap and seconds until the
+# answer is cut short
+QUERY_BUDGETS = {
+    'quick_fact': {'max_output_tokens': 400, 'timeout': 12.0},
+    'general': {'max_output_tokens': 1000, 'timeout': 25.0},
+    'itinerary': {'max_output_tokens': 2500, 'timeout': 45.0},
+}
+if QUERY_BUDGETS_OVERRIDES:
+    try:
+        for query_class, overrides in json.loads(QUERY_BUDGETS_OVERRIDES).items():
+            QUERY_BUDGETS.setdefault(query_class, dict(QUERY_BUDGETS['general'])).update(overrides)
+    except (ValueError, AttributeError) as e:
+        print(f"Error parsing QUERY_BUDGETS: {e}")
+
+ITINERARY_PATTERN = re.compile(
+    r'\b(plan|planning|itinerary|schedule|route|\d+\s*-?\s*(day|night)s?|(one|two|three|four|five|six|seven)'
+    r'\s*-?\s*(day|night)s?|week|weekend|road\s*trip)\b',
+    re.IGNORECASE
+)
+# Day, trip and plan in Hindi and Telugu; Indic vowel signs are not word
+# characters to re, so these match without word boundaries
+INDIC_ITINERARY_PATTERN = re.compile(r'दिन|यात्रा|योजना|రోజు|పర్యటన|ప్లాన్|ప్రణాళిక')
+QUICK_FACT_PATTERN = re.compile(
+    r'^(when|how (far|much|long|many|to reach|do i get))\b'
+    r'|\b(best time|timings?|opening hours|open|closed|distance|fee|fees|price|cost|tickets?|weather|'
+    r'temperature|nearest|how to reach)\b',
+    re.IGNORECASE
+)
+# Questions longer than this are never treated as quick facts
+QUICK_FACT_MAX_WORDS = 14
+
+# Ask for more detail after an answer that was cut short
+TRUNCATION_NOTE = "(I kept this answer short. Ask me for more details if you need them.)"
+
+# Recent Gemini call durations per query class
+query_latencies = {}
+_query_latencies_lock = threading.Lock()
+
+def classify_query(user_input):
+    """
+    Put a question into a query class with simple local rules.
+
+    ``itinerary`` covers trip planning, ``quick_fact`` short factual
+    questions (timings, prices, best time, distances) and ``general``
+    everything else. The quick-fact rules are English only, so questions
+    mostly in another script are never put below ``general``.
+    """
+    text = ' '.join(str(user_input).split())
+    if ITINERARY_PATTERN.search(text) or INDIC_ITINERARY_PATTERN.search(text):
+        return 'itinerary'
+    if script_ratios(text).get('en', 0) < SCRIPT_SKIP_RATIO:
+        return 'general'
+    if len(text.split()) <= QUICK_FACT_MAX_WORDS and QUICK_FACT_PATTERN.search(text):
+        return 'quick_fact'
+    return 'general'
+
+def query_budget(query_class):
+    """The generation budget for a class, or None when budgets are off."""
+    if not QUERY_BUDGETS_ENABLED:
+        return None
+    return QUERY_BUDGETS.get(query_class, QUERY_BUDGETS['general'])
+
+def generation_options(budget, deadline=None):
+    """
+    generate_content keyword arguments that apply a budget.
+
+    With a ``deadline`` (a time.perf_counter() value), the request timeout
+    is whatever is left of the budget, so a retry cannot overrun it.
+    """
+    if budget is None:
+        return {}
+    timeout = budget['timeout']
+    if deadline is not None:
+        timeout = max(0.1, min(timeout, deadline - time.perf_counter()))
+    return {
+        'generation_config': {'max_output_tokens': budget['max_output_tokens']},
+        # Bounds the wait for the response; the answer itself is cut at the deadline
+        'request_options': {'timeout': timeout},
+    }
+
+def hit_token_limit(chunk):
+    """Whether Gemini stopped because of max_output_tokens."""
+    candidates = getattr(chunk, 'candidates', None) or []
+    if not candidates:
+        return False
+    reason = getattr(candidates[0], 'finish_reason', None)
+    return getattr(reason, 'name', reason) in ('MAX_TOKENS', 2)
+
+def truncation_suffix(text):
+    """
+    Text to append to an answer that was cut short.
+
+    Only ever appends, so streamed text keeps growing: an ellipsis for an
+    unfinished sentence, then TRUNCATION_NOTE.
+    """
+    ending = "" if text.rstrip().endswith(('.', '!', '?', '।', '॥')) else "…"
+    return f"{ending}\n\n{TRUNCATION_NOTE}"
+
+def record_query_latency(query_class, seconds, truncated=None, language=None):
+    """Record a Gemini call's duration for its class, and why it was cut short, if it was."""
+    metrics.observe('saanchari_query_seconds', seconds, query_class=query_class, language=language)
+    if truncated:
+        metrics.inc('saanchari_truncated_answers_total', query_class=query_class, reason=truncated)
+    with _query_latencies_lock:
+        query_latencies.setdefault(query_class, deque(maxlen=1000)).append(seconds)
+
+def query_class_stats():
+    """Summarize Gemini call latency and truncated answers per query class."""
+    with _query_latencies_lock:
+        samples = {query_class: sorted(values) for query_class, values in query_latencies.items()}
+
+    def percentile(values, q):
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    return {
+        query_class: {
+            'count': len(values),
+            'p50': percentile(values, 0.50),
+            'p95': percentile(values, 0.95),
+            'p99': percentile(values, 0.99),
+            'truncated': sum(
+                metrics.counter_value('saanchari_truncated_answers_total', query_class=query_class, reason=reason)
+                for reason in ('deadline', 'max_tokens', 'error')
+            ),
+        }
+        for query_class, values in samples.items() if values
+    }
+
+def get_gemini_response(user_input, chat_history=None, language='English'):
+    """
+    Get response from Gemini model.
+
+    The answer is streamed internally, so the query budget's deadline can
+    cut it short with what has arrived so far instead of failing outright.
+    """
+    answer = ""
+    for answer in stream_gemini_response(user_input, chat_history, language):
+        pass
+    return answer.strip()
+
+async def get_gemini_response_async(user_input, chat_history=None, language='English'):
+    """Get response from Gemini model without blocking the event loop."""
+    lang_code = get_translator(language)
+    use_cache = not history_pairs(chat_history) and prompt_registry.uses_default(language)
+    if use_cache:
+        cached = response_cache.get(user_input, lang_code)
+        if cached is not None:
+            return cached
+    try:
+        prompt = build_prompt(user_input, chat_history, language)
+        with timed('gemini_call', language=lang_code):
+            answer, truncated = await gemini_flight.do_async(
+                gemini_flight_key(prompt, language), _generate_gemini_async,
+                prompt, language, classify_query(user_input)
+            )
+        # An answer cut off by the deadline may come out whole next time
+        if use_cache and truncated != 'deadline':
+            response_cache.set(user_input, answer)
+        return answer
     except Exception as e:
+        record_error('get_gemini_response')
         return f"Error getting response from Gemini: {str(e)}"
 
-def chat_with_gemini(user_input, chat_history=None):
-    """Handle chat interaction with Gemini."""
-    response = get_gemini_response(user_input)
+async def _generate_gemini_async(prompt, language, query_class):
+    """Stream one answer within its query budget; returns (answer, truncation reason or None)."""
+    budget = query_budget(query_class)
+    lang_code = get_translator(language)
+    started = time.perf_counter()
+    pieces = []
+    last_chunk = None
+    deadline = started + budget['timeout'] if budget else None
+
+    async def open_stream():
+        return await get_model(language).generate_content_async(
+            prompt, stream=True, **generation_options(budget, deadline)
+        )
+
+    async def consume():
+        nonlocal last_chunk
+        # Only opening the stream is retried; a half-sent answer cannot be replayed
+        response = await gemini_upstream.call_async(open_stream, metric_language=lang_code, deadline=deadline)
+        async for chunk in response:
+            last_chunk = chunk
+            pieces.append(getattr(chunk, "text", "") or "")
+
+    truncated = None
+    try:
+        if budget is None:
+            await consume()
+        else:
+            await asyncio.wait_for(consume(), budget['timeout'])
+    except asyncio.TimeoutError:
+        if not ''.join(pieces).strip():
+            record_query_latency(query_class, time.perf_counter() - started, 'deadline', lang_code)
+            raise UpstreamUnavailable(f"no answer within {budget['timeout']:g}s")
+        truncated = 'deadline'
+
+    elapsed = time.perf_counter() - started
+    record_gemini_usage(last_chunk, elapsed, lang_code)
+    answer = ''.join(pieces)
+    if truncated is None and hit_token_limit(last_chunk):
+        truncated = 'max_tokens'
+    if truncated:
+        answer += truncation_suffix(answer)
+    record_query_latency(query_class, elapsed, truncated, lang_code)
+    return answer.strip(), truncated
+
+# Recent (time_to_first_token, total_time) samples from streamed responses
+stream_timings = deque(maxlen=1000)
+
+def stream_gemini_response(user_input, chat_history=None, language='English'):
+    """
+    Stream a response from the Gemini model.
+
+    Yields the accumulated answer text each time a new piece arrives, so the
+    caller can re-render the partial answer. Time-to-first-token and total
+    generation time are recorded in ``stream_timings``. Identical prompts
+    streamed at the same time share one Gemini stream.
+    """
+    use_cache = not history_pairs(chat_history) and prompt_registry.uses_default(language)
+    if use_cache:
+        cached = response_cache.get(user_input, get_translator(language))
+        if cached is not None:
+            yield cached
+            return
+
+    prompt = build_prompt(user_input, chat_history, language)
+    yield from gemini_flight.stream(
+        gemini_flight_key(prompt, language), _stream_gemini_prompt,
+        user_input, prompt, use_cache, language, classify_query(user_input)
+    )
+
+def _stream_gemini_prompt(user_input, prompt, use_cache, language, query_class):
+    budget = query_budget(query_class)
+    lang_code = get_translator(language)
+    started = time.perf_counter()
+    deadline = started + budget['timeout'] if budget else math.inf
+    first_token_at = None
+    last_chunk = None
+    truncated = None
+    text = ""
+
+    def open_stream():
+        return get_model(language).generate_content(
+            prompt, stream=True, **generation_options(budget, deadline if budget else None)
+        )
+
+    try:
+        # Only opening the stream is retried, and never past the deadline;
+        # a half-sent answer cannot be replayed
+        for chunk in gemini_upstream.call(
+            open_stream, metric_language=lang_code, deadline=deadline if budget else None
+        ):
+            # The final chunk carries the usage totals
+            last_chunk = chunk
+            piece = getattr(chunk, "text", "")
+            if not piece:
+                continue
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+                metrics.observe(
+                    'saanchari_stage_seconds', first_token_at - started, stage='gemini_first_token', language=lang_code
+                )
+            text += piece
+            yield text
+            if time.perf_counter() >= deadline:
+                truncated = 'deadline'
+                break
+        record_gemini_usage(last_chunk, time.perf_counter() - started, lang_code)
+        if truncated is None and hit_token_limit(last_chunk):
+            truncated = 'max_tokens'
+        if truncated:
+            text += truncation_suffix(text)
+            yield text
+        # An answer cut off by the deadline may come out whole next time
+        if use_cache and truncated != 'deadline':
+            response_cache.set(user_input, text.strip())
+    except Exception as e:
+        record_error('stream_gemini_response')
+        # Keep whatever was already shown; only report a failure with no output
+        if not text.strip():
+            yield f"Error getting response from Gemini: {str(e)}"
+        else:
+            print(f"Gemini stream interrupted: {e}")
+            # Usually the request timeout: finish the answer gracefully
+            truncated = 'deadline' if time.perf_counter() >= deadline else 'error'
+            text += truncation_suffix(text)
+            yield text
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.observe('saanchari_stage_seconds', elapsed, stage='gemini_call', language=lang_code)
+        record_query_latency(query_class, elapsed, truncated, lang_code)
+        if first_token_at is not None:
+            stream_timings.append((first_token_at - started, time.perf_counter() - started))
+
+def iter_sentences(partials):
+    """
+    Turn a stream of accumulated text into complete sentences.
+
+    A sentence is complete once a boundary from SENTENCE_BOUNDARY follows it,
+    i.e. the same rule split_into_chunks uses. Whatever is left when the
+    stream ends is yielded as the final sentence.
+    """
+    text = ""
+    consumed = 0
+    for text in partials:
+        pending = text[consumed:]
+        last_end = 0
+        for boundary in SENTENCE_BOUNDARY.finditer(pending):
+            sentence = pending[last_end:boundary.start()].strip()
+            if sentence:
+                yield sentence
+            last_end = boundary.end()
+        consumed += last_end
+    remainder = text[consumed:].strip()
+    if remainder:
+        yield remainder
+
+def stream_translated_response(user_input, target_lang, max_retries=3, chat_history=None):
+    """
+    Stream a Gemini answer while translating it sentence by sentence.
+
+    Each finished sentence is handed to the translation pool straight away,
+    so generation and translation overlap. Yields (english_text,
+    translated_text) pairs; translated text only grows in sentence order.
+    """
+    lang_code = get_translator(target_lang)
+    prefix = LANG_PREFIX.get(target_lang, "")
+    english = {'text': ""}
+    
+    def partials():
+        for partial in stream_gemini_response(user_input, chat_history, target_lang):
+            english['text'] = partial
+            yield partial
+    
+    pending = []
+    translated = []
+    
+    def render():
+        result = ' '.join(translated).strip()
+        return english['text'], f"{prefix}{result}" if result else ""
+    
+    def collect_ready():
+        # Only move forward over finished translations to keep sentence order
+        while pending and pending[0].done():
+            translated.append(pending.pop(0).result())
+    
+    for sentence in iter_sentences(partials()):
+        pending.append(_chunk_executor.submit(translate_chunk, sentence, lang_code, max_retries))
+        collect_ready()
+        yield render()
     
-    if chat_history is None:
-        chat_history = []
+    while pending:
+        translated.append(pending.pop(0).result())
+        yield render()
     
-    return "", chat_history + [[user_input, response]]
+    yield render()
+
+# Streamed Gemini calls are driven on their own pool so they never occupy
+# the threads that serve language switches
+_stream_executor = ContextThreadPoolExecutor(max_workers=CHAT_CONCURRENCY, thread_name_prefix='gemini-stream')
+
+async def iterate_in_executor(generator, executor=None):
+    """Consume a blocking generator from async code, one item per executor call."""
+    loop = asyncio.get_running_loop()
+    done = object()
+    while True:
+        item = await loop.run_in_executor(executor or _stream_executor, next, generator, done)
+        if item is done:
+            break
+        yield item
+
+def streaming_stats():
+    """Summarize time-to-first-token and total latency of streamed responses."""
+    samples = list(stream_timings)
+    if not samples:
+        return {'count': 0}
+    first_tokens = sorted(sample[0] for sample in samples)
+    totals = sorted(sample[1] for sample in samples)
+    
+    def percentile(values, q):
+        return values[min(len(values) - 1, int(q * len(values)))]
+    
+    return {
+        'count': len(samples),
+        'ttft_p50': percentile(first_tokens, 0.50),
+        'ttft_p95': percentile(first_tokens, 0.95),
+        'total_p50': percentile(totals, 0.50),
+        'total_p95': percentile(totals, 0.95),
+    }
 
 def translate_chat(chat_history, language):
     """
@@ -213,383 +2346,901 @@ def translate_chat(chat_history, language):
     if not chat_history or language in ["English", "en"]:
         return chat_history
     
-    translated_history = []
+    pairs = []
     
     for user_msg, bot_msg in chat_history:
         # Skip translation if messages are empty
         user_msg = str(user_msg) if user_msg is not None else ""
         bot_msg = str(bot_msg) if bot_msg is not None else ""
-        
-        # Translate user message
-        translated_user = translate_text(user_msg, language, is_user_message=True) if user_msg.strip() else ""
-        # Translate bot message
-        translated_bot = translate_text(bot_msg, language, is_user_message=False) if bot_msg.strip() else ""
-        
-        translated_history.append([translated_user, translated_bot])
-    
-    return translated_history
-
-# Create the Gradio interface
-with gr.Blocks(
-    theme=gr.themes.Soft(
-        primary_hue="pink",
-        secondary_hue="orange",
-        neutral_hue="slate"
-    ),
-    css="""
-        .gradio-container {
-            max-width: 900px !important;
-            margin: 0 auto;
-            padding: 20px;
-        }
-        h1 {
-            background: linear-gradient(90deg, #F75768, #FB6957);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            text-align: center;
-            margin-bottom: 10px !important;
-        }
-        .gradio-markdown p {
-            text-align: center;
-            margin-bottom: 20px !important;
-            color: #555;
-        }
-        .examples-container {
-            display: flex;
-            gap: 15px;
-            flex-wrap: wrap;
-            margin-bottom: 20px;
-        }
-        .example-box {
-            border-left: 4px solid #F75768 !important;
-            border-radius: 4px;
-            padding: 12px 16px !important;
-            margin: 0 !important;
-            transition: all 0.2s ease;
-            flex: 1;
-            min-width: 200px;
-            max-width: 100%;
-            box-sizing: border-box;
-            background: white;
-            box-shadow: 0 2px 6px rgba(0,0,0,0.05);
-        }
-        .example-box:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 4px 12px rgba(0,0,0,0.1);
-            cursor: pointer;
-        }
-        .example-text {
-            background: linear-gradient(90deg, #F75768, #FB6957);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            margin: 0 !important;
-            font-weight: 500;
-            font-size: 0.95em;
-            line-height: 1.4;
-        }
-        .example-label {
-            color: #666;
-            font-size: 1em;
-            margin-bottom: 15px !important;
-            font-weight: 600;
-            width: 100%;
-        }
-    """
-) as demo:
-    # Header with full-width logo as heading
-    gr.HTML("""
-    <div style="display: flex; flex-direction: column; align-items: center; margin: 0 auto 20px; max-width: 100%;">
-        <img 
-            src="https://huggingface.co/spaces/vidhyaS/Saanchari_AP/resolve/main/logo.png" 
-            alt="Saanchari" 
-            style="
-                height: auto;
-                width: 80%;
-                max-width: 400px;
-                object-fit: contain;
-                margin: 0 auto 15px;
-            ">
-        <p style="text-align: center; color: #555; margin: 0; font-size: 1.1em;">Your expert travel assistant for Andhra Pradesh</p>
-    """)
-    
-    # Function to handle example question clicks
-    def submit_question(question, chat_history):
-        if chat_history is None:
-            chat_history = []
-        # Add user question to chat
-        chat_history.append((question, None))
-        # Get response from Gemini
-        response = get_gemini_response(question)
-        # Add response to chat
-        chat_history[-1] = (question, response)
-        return "", chat_history
-    
-    # Chat title and language selection in one row
-    with gr.Row(equal_height=True, variant="compact"):
-        gr.Markdown("### Chat with Saanchari")
-        
-        # Language selection buttons
-        with gr.Row(variant="compact"):
-            en_btn = gr.Button("EN", size="sm", variant="primary", min_width=50)
-            hi_btn = gr.Button("हिंदी", size="sm", min_width=50)
-            te_btn = gr.Button("తెలుగు", size="sm", min_width=50)
-    
-    # Main chat interface
-    chatbot = gr.Chatbot(height=400, show_label=False)
-    
-    # Chat controls row
-    with gr.Row():
-        # Chat input
-        user_input = gr.Textbox(
-            label="Ask me anything about travel in Andhra Pradesh",
-            placeholder="E.g., Best places to visit in Visakhapatnam?",
-            scale=4,
-            show_label=False
-        )
-        submit_btn = gr.Button("Send", variant="primary")
-    
-    # Example questions
-    with gr.Row():
-        # Example questions will go here
-        pass
-    
-    # Store the current question and language
-    current_question = gr.State("")
-    current_language = gr.State("English")
-    active_button = gr.State("en")
-    
-    def set_question(question):
-        return question, question
+        pairs.append([user_msg, bot_msg])
     
-    # Example questions with click handlers
-    with gr.Row():
-        with gr.Column():
-            gr.Markdown("### Try asking me about:")
-            
-            with gr.Row():
-                example_questions = [
-                    ("Must-visit places in Visakhapatnam", "What are the must-visit places in Visakhapatnam?"),
-                    ("3-day trip to Araku Valley", "Plan a 3-day trip to Araku Valley"),
-                    ("Best time to visit Tirupati", "What is the best time to visit Tirupati?")
-                ]
-                
-                for btn_text, question in example_questions:
-                    with gr.Row():
-                        btn = gr.Button(
-                            btn_text, 
-                            variant="secondary",
-                            min_width=200,
-                            size="sm"
-                        )
-                        btn.click(
-                            fn=set_question,
-                            inputs=[gr.State(question)],
-                            outputs=[user_input, current_question]
-                        )
-
-    # Add some space
-    gr.HTML("<div style='margin-bottom: 20px;'></div>")
-    
-    # Add custom CSS
-    gr.HTML("""
-    <style>
-        .gradio-button {
-            margin: 0 2px !important;
-            border-radius: 4px !important;
-            min-width: 45px !important;
-            padding: 2px 6px !important;
-            font-size: 0.8em !important;
-        }
-        .gradio-button:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }
-        .gradio-row {
-            align-items: center;
-            gap: 10px;
-        }
-        .gradio-markdown h3 {
-            margin: 0 !important;
-            padding: 8px 0;
-        }
-    </style>
-    """)
+    return translate_pairs(pairs, language)
+
+def translate_pairs(pairs, language):
+    """
+    Translate [user_message, bot_message] pairs, keeping their order.
+
+    Messages that are empty or already carry the target language prefix are
+    left as they are. User and bot turns are packed together into a few
+    batched requests by translate_batch.
+    """
+    target_prefix = "[हिंदी]" if language == "Hindi" else "[తెలుగు]"
     
-    # Handle chat interactions
-    chat_inputs = [user_input, chatbot]
-    chat_outputs = [user_input, chatbot]
+    messages = [message for pair in pairs for message in pair]
+    pending = [
+        index for index, message in enumerate(messages)
+        if message.strip() and target_prefix not in message
+    ]
+    translated = translate_batch([messages[index] for index in pending], language)
+    for index, text in zip(pending, translated):
+        messages[index] = text
     
-    # This function is now replaced by the unified translate_text function above
+    return [[messages[i], messages[i + 1]] for i in range(0, len(messages), 2)]
+
+class ChatTurn:
+    """One chat exchange: the canonical English text plus its rendered translations."""
 
-    def set_language(selected_lang, current_chat, current_lang_state):
+    __slots__ = ('user', 'bot', 'translations', 'pending', 'streaming')
+
+    def __init__(self, user, bot, streaming=False):
+        self.user = user
+        self.bot = bot
+        self.translations = {}
+        # Background translations in progress, by language (see pretranslate_turn)
+        self.pending = None
+        # The answer is still arriving; its text is not final yet
+        self.streaming = streaming
+
+    def render(self, language):
+        """Return the [user_message, bot_message] pair shown for a language."""
+        if language in ["English", "en"]:
+            return [self.user, self.bot]
+        return list(self.translations.get(language, [self.user, self.bot]))
+
+def strip_language_prefixes(text):
+    """Remove the [हिंदी]/[తెలుగు] markers added by translate_text."""
+    return str(text).replace("[हिंदी]", "").replace("[తెలుగు]", "").strip()
+
+def turns_from_chat(chat_history):
+    """Build ChatTurn records from a plain Chatbot value (e.g. from API clients)."""
+    turns = []
+    for message in chat_history or []:
+        if isinstance(message, (list, tuple)) and len(message) >= 2:
+            user_msg = strip_language_prefixes(message[0]) if message[0] is not None else ""
+            bot_msg = strip_language_prefixes(message[1]) if message[1] is not None else None
+            turns.append(ChatTurn(user_msg, bot_msg))
+    return turns
+
+class KnowledgePack:
+    """
+    Read-only, memory-mapped index of precomputed answers in every language.
+
+    File layout (little-endian)::
+
+        header   b"SKP1", version u16, reserved u16, entry count u32
+        index    entry count x (key hash u64, payload offset u32, payload length u32),
+                 sorted by hash
+        payloads UTF-8 JSON: {"key": ..., "<language>": [question, answer], ...}
+
+    Lookups normalize the question, binary-search the index inside the
+    mapping and decode only the matching payload, so the pack costs almost
+    no memory however large it grows. A rebuilt file is picked up within
+    ``reload_interval`` seconds.
+    """
+
+    MAGIC = b"SKP1"
+    VERSION = 1
+    HEADER = struct.Struct('<4sHHI')
+    RECORD = struct.Struct('<QII')
+
+    def __init__(self, path, reload_interval=60.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.hits = 0
+        self.misses = 0
+        self._map = None
+        self._count = 0
+        self._mtime = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(question):
+        return normalize_question(question)
+
+    @staticmethod
+    def _hash(key):
+        return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+
+    @classmethod
+    def write(cls, path, entries):
+        """
+        Write a pack file atomically.
+
+        ``entries`` maps a question to ``{language: [question, answer]}``;
+        readers holding the old file keep their mapping until they reload.
+        """
+        records = []
+        for question, translations in entries.items():
+            key = cls.key(question)
+            payload = json.dumps(dict(translations, key=key), ensure_ascii=False).encode('utf-8')
+            records.append((cls._hash(key), payload))
+        records.sort(key=lambda record: record[0])
+
+        offset = cls.HEADER.size + cls.RECORD.size * len(records)
+        index = bytearray()
+        for key_hash, payload in records:
+            index += cls.RECORD.pack(key_hash, offset, len(payload))
+            offset += len(payload)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as pack_file:
+            pack_file.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, 0, len(records)))
+            pack_file.write(index)
+            for _, payload in records:
+                pack_file.write(payload)
+        os.replace(tmp_path, path)
+        return len(records)
+
+    def _refresh(self):
+        """(Re)open the mapping if the file appeared or changed; call with the lock held."""
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
         try:
-            # If already in this language, do nothing
-            if selected_lang == current_lang_state:
-                return current_chat, selected_lang
-                
-            # If switching to English, show original text
-            if selected_lang == "English":
-                # Remove language prefixes
-                cleaned_chat = []
-                for message in current_chat:
-                    if isinstance(message, (list, tuple)) and len(message) >= 2:
-                        user_msg = str(message[0]).replace("[हिंदी]", "").replace("[తెలుగు]", "").strip()
-                        bot_msg = str(message[1]).replace("[हिंदी]", "").replace("[తెలుగు]", "").strip()
-                        cleaned_chat.append([user_msg, bot_msg])
-                return cleaned_chat, selected_lang
-                
-            # If switching to another language, translate the chat
-            translated_chat = []
-            for message in current_chat:
-                if isinstance(message, (list, tuple)) and len(message) >= 2:
-                    user_msg = str(message[0])
-                    bot_msg = str(message[1])
-                    
-                    # Skip translation if already in target language
-                    target_prefix = "[हिंदी]" if selected_lang == "Hindi" else "[తెలుగు]"
-                    if target_prefix not in user_msg:
-                        user_msg = translate_text(user_msg, selected_lang, is_user_message=True)
-                    if target_prefix not in bot_msg:
-                        bot_msg = translate_text(bot_msg, selected_lang, is_user_message=False)
-                        
-                    translated_chat.append([user_msg, bot_msg])
-            
-            return translated_chat, selected_lang
-            
-        except Exception as e:
-            print(f"Error in set_language: {e}")
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            self._close()
+            return
+        if mtime == self._mtime:
+            return
+        self._close()
+        try:
+            with open(self.path, 'rb') as pack_file:
+                mapping = mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, _, count = self.HEADER.unpack_from(mapping, 0)
+            if magic != self.MAGIC or version != self.VERSION:
+                raise ValueError(f"unsupported knowledge pack format {magic!r} v{version}")
+            self._map, self._count, self._mtime = mapping, count, mtime
+        except (OSError, ValueError, struct.error) as e:
+            print(f"Error loading knowledge pack: {e}")
+            record_error('knowledge_pack')
+
+    def _close(self):
+        if self._map is not None:
+            self._map.close()
+        self._map, self._count, self._mtime = None, 0, None
+
+    def get(self, question, language=None):
+        """
+        Return ``{language: [question, answer]}`` for a known question, or None.
+
+        ``language`` is the code of the session asking, for the lookup metrics.
+        """
+        if not self.path:
+            return None
+        key = self.key(question)
+        key_hash = self._hash(key)
+        with self._lock:
+            self._refresh()
+            if self._map is None:
+                return None
+            low, high = 0, self._count
+            while low < high:
+                middle = (low + high) // 2
+                record_hash, _, _ = self.RECORD.unpack_from(self._map, self.HEADER.size + middle * self.RECORD.size)
+                if record_hash < key_hash:
+                    low = middle + 1
+                else:
+                    high = middle
+            entry = None
+            while low < self._count:
+                record_hash, offset, length = self.RECORD.unpack_from(self._map, self.HEADER.size + low * self.RECORD.size)
+                if record_hash != key_hash:
+                    break
+                candidate = json.loads(self._map[offset:offset + length].decode('utf-8'))
+                if candidate.pop('key') == key:
+                    entry = candidate
+                    break
+                low += 1
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        metrics.inc(
+            'saanchari_cache_lookups_total', cache='knowledge_pack', result='hit' if entry else 'miss', language=language
+        )
+        return entry
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': self._count}
+
+knowledge_pack = KnowledgePack(KNOWLEDGE_PACK_PATH, reload_interval=KNOWLEDGE_PACK_RELOAD_INTERVAL)
+
+def answer_from_knowledge_pack(user_input, conversation, current_lang):
+    """
+    Build the chat turn for an opening question found in the knowledge pack.
+
+    Every language's translation is filled in from the pack, so neither this
+    answer nor later language switches need an upstream call. Returns None
+    for follow-up questions and unknown questions.
+    """
+    if history_pairs(conversation):
+        return None
+    entry = knowledge_pack.get(user_input, get_translator(current_lang))
+    if not entry or 'English' not in entry:
+        return None
+    turn = ChatTurn(user_input, entry['English'][1])
+    for language, pair in entry.items():
+        if language != 'English':
+            turn.translations[language] = list(pair)
+    if current_lang in turn.translations:
+        # Show the question as the user typed it
+        turn.translations[current_lang][0] = user_input
+    return turn
+
+def render_turns(turns, language):
+    """
+    Render a conversation in the given language.
+
+    Only turns that have never been shown in this language are translated;
+    everything else comes straight from the stored translations, so switching
+    languages back and forth costs O(new messages) rather than O(history).
+    A turn whose answer is still streaming is shown as it is and translated
+    on a later render, once the answer is complete.
+    """
+    if language not in ["English", "en"]:
+        for turn in turns:
+            # Reuse a background translation that is still running
+            future = turn.pending.get(language) if turn.pending else None
+            if future is not None and language not in turn.translations:
+                future.result()
+        pending = [turn for turn in turns if language not in turn.translations and not turn.streaming]
+        if pending:
+            pairs = [
+                [turn.user or "", turn.bot if turn.bot is not None else ""]
+                for turn in pending
+            ]
+            with timed('history_translation', language=get_translator(language)):
+                translated_pairs = translate_pairs(pairs, language)
+            for turn, translated in zip(pending, translated_pairs):
+                turn.translations[language] = translated
+    return [turn.render(language) for turn in turns]
+
+# Background translations of new answers; separate from the translation pools
+# the workers submit to, so they cannot deadlock on them
+_pretranslate_executor = ThreadPoolExecutor(max_workers=PRETRANSLATE_WORKERS, thread_name_prefix='pretranslate')
+_pretranslate_pending = 0
+_pretranslate_lock = threading.Lock()
+
+def _pretranslate(turn, language):
+    global _pretranslate_pending
+    try:
+        with timed('pretranslation', language=get_translator(language)):
+            translated = translate_pairs([[turn.user or "", turn.bot or ""]], language)[0]
+        turn.translations.setdefault(language, translated)
+        metrics.inc('saanchari_pretranslations_total', language=get_translator(language))
+    except Exception as e:
+        print(f"Error in pretranslation: {e}")
+        record_error('pretranslate')
+    finally:
+        turn.pending.pop(language, None)
+        with _pretranslate_lock:
+            _pretranslate_pending -= 1
+        metrics.add_gauge('saanchari_pretranslation_queue', -1)
+
+def pretranslate_turn(turn, current_lang):
+    """
+    Queue translations of a finished turn into every language except the current one.
+
+    Does nothing unless PRETRANSLATE_RESPONSES is set. Turns are skipped
+    while PRETRANSLATE_MAX_PENDING are already waiting; they are translated
+    on the next language switch instead.
+    """
+    global _pretranslate_pending
+    if not PRETRANSLATE_RESPONSES or not turn.bot:
+        return
+    for language, lang_code in LANG_MAP.items():
+        if lang_code == 'en' or language == current_lang or language in turn.translations:
+            continue
+        with _pretranslate_lock:
+            if _pretranslate_pending >= PRETRANSLATE_MAX_PENDING:
+                metrics.inc('saanchari_pretranslations_skipped_total')
+                return
+            _pretranslate_pending += 1
+        metrics.add_gauge('saanchari_pretranslation_queue', 1)
+        if turn.pending is None:
+            turn.pending = {}
+        turn.pending[language] = _pretranslate_executor.submit(_pretranslate, turn, language)
+
+class Session:
+    """The stored turns of one chat session, keeping at most ``max_turns``."""
+
+    __slots__ = ('id', 'turns', 'max_turns', 'touched', 'language')
+
+    def __init__(self, session_id, turns=(), max_turns=SESSION_MAX_TURNS):
+        self.id = session_id
+        self.max_turns = max_turns
+        self.turns = list(turns)[-max_turns:]
+        self.touched = time.monotonic()
+        # The language the chat is shown in; a switch while an answer is
+        # still streaming updates it, and the stream renders in it from then on
+        self.language = None
+
+    def add(self, turn):
+        """Append a turn, dropping the oldest ones beyond the cap."""
+        self.turns.append(turn)
+        if len(self.turns) > self.max_turns:
+            del self.turns[:len(self.turns) - self.max_turns]
+
+    def render(self, language, window=None):
+        """Render the visible window (the most recent turns) in a language."""
+        return render_turns(self.turns[-(window or SESSION_VISIBLE_TURNS):], language)
+
+class SessionStore:
+    """
+    Server-side chat sessions keyed by a random ID.
+
+    Gradio state only carries the session ID and the Chatbot only the
+    visible window, so event payloads stay small however long a session
+    runs. Sessions idle for ``ttl`` seconds expire, and the least recently
+    used are evicted beyond ``max_sessions``.
+    """
+
+    def __init__(self, max_sessions=10000, ttl=6 * 3600, max_turns=SESSION_MAX_TURNS):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_turns = max_turns
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, session_id, chat_history=None):
+        """
+        Return the session for an ID.
+
+        Unknown or expired IDs (e.g. after a restart, or API clients without
+        state) get a new session rebuilt from the visible chat.
+        """
+        now = time.monotonic()
+        with self._lock:
+            # Sessions are kept in last-used order, so expired ones are at the front
+            while self._sessions:
+                oldest = next(iter(self._sessions.values()))
+                if now - oldest.touched <= self.ttl:
+                    break
+                self._sessions.popitem(last=False)
+
+            session = self._sessions.get(session_id) if session_id else None
+            if session is None:
+                session = Session(uuid.uuid4().hex, turns_from_chat(chat_history), self.max_turns)
+                self._sessions[session.id] = session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+            session.touched = now
+            return session
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'turns': sum(len(session.turns) for session in self._sessions.values()),
+            }
+
+session_store = SessionStore(max_sessions=SESSION_MAX_COUNT, ttl=SESSION_TTL, max_turns=SESSION_MAX_TURNS)
+
+@instrument_handler('set_language', language_arg=0)
+def set_language(selected_lang, current_chat, current_lang_state, session_id=None):
+    try:
+        # If already in this language, do nothing
+        if selected_lang == current_lang_state:
             return current_chat, selected_lang
 
-    def chat_with_gemini(user_input, chat_history, current_lang):
-        try:
-            if not user_input or not user_input.strip():
-                return "", chat_history or [], current_lang
-                
-            # Clean the user input
-            user_input = user_input.strip()
-            
-            # Get response from Gemini
-            response = get_gemini_response(user_input)
-            
-            if chat_history is None:
-                chat_history = []
-            
-            # Add user message and bot response to chat history
-            chat_history.append((user_input, response))
-            
-            # If not in English, translate the response
-            if current_lang != "English":
-                try:
-                    # Translate the response
-                    translated_response = translate_text(response, current_lang, is_user_message=False)
-                    # Update the last message in chat history with translated response
-                    if chat_history:
-                        chat_history[-1] = (chat_history[-1][0], translated_response)
-                except Exception as e:
-                    print(f"Error in translation: {e}")
-                    # If translation fails, keep the original response
-                    pass
-            
-            return "", chat_history, current_lang
-            
-        except Exception as e:
-            print(f"Error in chat_with_gemini: {e}")
-            return "", chat_history or [], current_lang
+        # Render the visible window from the stored turns, translating only unseen ones
+        session = session_store.load(session_id, current_chat)
+        session.language = selected_lang
+        return session.render(selected_lang), selected_lang
+
+    except Exception as e:
+        print(f"Error in set_language: {e}")
+        record_error('set_language')
+        return current_chat, selected_lang
+
+@instrument_handler('chat_with_gemini', language_arg=2)
+def chat_with_gemini(user_input, chat_history, current_lang, session_id=None):
+    try:
+        if not user_input or not user_input.strip():
+            return "", chat_history or [], session_id
+
+        # Clean the user input
+        user_input = user_input.strip()
+
+        session = session_store.load(session_id, chat_history)
+        session.language = current_lang
+        session_id = session.id
+
+        # Common opening questions are answered from the precomputed pack
+        pack_turn = answer_from_knowledge_pack(user_input, session.turns, current_lang)
+        if pack_turn is not None:
+            session.add(pack_turn)
+            return "", session.render(current_lang), session_id
+
+        # Get response from Gemini, with the earlier turns as context
+        response = get_gemini_response(user_input, session.turns, current_lang)
+
+        # Store the canonical English turn
+        turn = ChatTurn(user_input, response)
+        session.add(turn)
+
+        # If not in English, translate the response
+        if current_lang != "English":
+            try:
+                # Translate the response and remember it for this language
+                translated_response = translate_text(response, current_lang, is_user_message=False)
+                turn.translations[current_lang] = [user_input, translated_response]
+            except Exception as e:
+                print(f"Error in translation: {e}")
+                record_error('translate_response')
+                # If translation fails, keep the original response
+                pass
+
+        pretranslate_turn(turn, current_lang)
+        return "", session.render(current_lang), session_id
+
+    except Exception as e:
+        print(f"Error in chat_with_gemini: {e}")
+        record_error('chat_with_gemini')
+        return "", chat_history or [], session_id
+
+@instrument_handler('stream_chat_with_gemini', language_arg=2)
+def stream_chat_with_gemini(user_input, chat_history, current_lang, session_id=None):
+    """Generator version of chat_with_gemini that streams the answer into the chat."""
+    try:
+        if not user_input or not user_input.strip():
+            yield "", chat_history or [], session_id
+            return
+
+        # Without the pipeline, translated sessions wait for the full answer
+        if current_lang != "English" and not PIPELINED_TRANSLATION:
+            yield chat_with_gemini(user_input, chat_history, current_lang, session_id)
+            return
+
+        # Clean the user input
+        user_input = user_input.strip()
+
+        session = session_store.load(session_id, chat_history)
+        session.language = current_lang
+        session_id = session.id
+
+        # Common opening questions are answered from the precomputed pack
+        pack_turn = answer_from_knowledge_pack(user_input, session.turns, current_lang)
+        if pack_turn is not None:
+            session.add(pack_turn)
+            yield "", session.render(current_lang), session_id
+            return
+
+        # Show the question straight away and fill in the answer as it streams
+        history = list(session.turns)
+        turn = ChatTurn(user_input, "", streaming=True)
+        if current_lang != "English":
+            turn.translations[current_lang] = [user_input, ""]
+        session.add(turn)
+        yield "", session.render(session.language), session_id
 
-    def update_language(selected_lang, current_chat, current_lang_state):
-        """Update the language of the chat interface."""
         try:
-            # If already in this language, do nothing
-            if selected_lang == current_lang_state:
-                return current_chat, selected_lang, selected_lang.lower()
-                
-            # If switching to English, show original text
-            if selected_lang == "English":
-                # Remove language prefixes
-                cleaned_chat = []
-                for message in current_chat:
-                    if isinstance(message, (list, tuple)) and len(message) >= 2:
-                        user_msg = str(message[0]).replace("[हिंदी]", "").replace("[తెలుగు]", "").strip()
-                        bot_msg = str(message[1]).replace("[हिंदी]", "").replace("[తెలుగు]", "").strip()
-                        cleaned_chat.append([user_msg, bot_msg])
-                return cleaned_chat, selected_lang, "en"
-                
-            # If switching to another language, translate the chat
-            translated_chat = []
-            for message in current_chat:
-                if isinstance(message, (list, tuple)) and len(message) >= 2:
-                    user_msg = str(message[0])
-                    bot_msg = str(message[1])
-                    
-                    # Skip translation if already in target language
-                    target_prefix = "[हिंदी]" if selected_lang == "Hindi" else "[తెలుగు]"
-                    if target_prefix not in user_msg:
-                        user_msg = translate_text(user_msg, selected_lang, is_user_message=True)
-                    if target_prefix not in bot_msg:
-                        bot_msg = translate_text(bot_msg, selected_lang, is_user_message=False)
-                        
-                    translated_chat.append([user_msg, bot_msg])
-            
-            return translated_chat, selected_lang, selected_lang.lower()
-            
-        except Exception as e:
-            print(f"Error in update_language: {e}")
-            return current_chat, current_lang_state, current_lang_state.lower()
-
-    # Store the active button state
-    active_button = gr.State("en")
-
-    # Set up button click handlers
-    en_btn.click(
-        fn=update_language,
-        inputs=[gr.State("English"), chatbot, current_language],
-        outputs=[chatbot, current_language, active_button],
-        api_name="set_english"
-    )
+            if current_lang == "English":
+                for partial in stream_gemini_response(user_input, history, current_lang):
+                    turn.bot = partial
+                    yield "", session.render(session.language), session_id
+            else:
+                # Translate sentence by sentence while the answer is still streaming
+                for english, translated in stream_translated_response(
+                    user_input, current_lang, chat_history=history
+                ):
+                    turn.bot = english
+                    turn.translations[current_lang] = [user_input, translated]
+                    yield "", session.render(session.language), session_id
+        finally:
+            turn.streaming = False
 
-    hi_btn.click(
-        fn=update_language,
-        inputs=[gr.State("Hindi"), chatbot, current_language],
-        outputs=[chatbot, current_language, active_button],
-        api_name="set_hindi"
-    )
+        turn.bot = turn.bot.strip()
+        pretranslate_turn(turn, current_lang)
+        yield "", session.render(session.language), session_id
 
-    te_btn.click(
-        fn=update_language,
-        inputs=[gr.State("Telugu"), chatbot, current_language],
-        outputs=[chatbot, current_language, active_button],
-        api_name="set_telugu"
-    )
+    except Exception as e:
+        print(f"Error in stream_chat_with_gemini: {e}")
+        record_error('stream_chat_with_gemini')
+        yield "", chat_history or [], session_id
 
-    def chat_with_gemini_translate(user_input, chat_history, current_lang):
+@instrument_handler('chat_with_gemini_async', language_arg=2)
+async def chat_with_gemini_async(user_input, chat_history, current_lang, session_id=None):
+    """Async version of chat_with_gemini used by the queued chat endpoint."""
+    try:
         if not user_input or not user_input.strip():
-            return "", chat_history or [], current_lang
-            
+            return "", chat_history or [], session_id
+
         # Clean the user input
         user_input = user_input.strip()
-        
-        # Use the main chat function for translation
-        return chat_with_gemini(user_input, chat_history, current_lang)
 
-    # Set up the chat interface
-        # Set up the chat interface
-    chat_msg = user_input.submit(
-        chat_with_gemini,
-        inputs=[user_input, chatbot, current_language],
-        outputs=[user_input, chatbot, current_language],
-        queue=False,
-        api_name="chat_click"
+        session = session_store.load(session_id, chat_history)
+        session.language = current_lang
+        session_id = session.id
+
+        # Common opening questions are answered from the precomputed pack
+        pack_turn = answer_from_knowledge_pack(user_input, session.turns, current_lang)
+        if pack_turn is not None:
+            session.add(pack_turn)
+            return "", session.render(current_lang), session_id
+
+        # Get response from Gemini, with the earlier turns as context
+        response = await get_gemini_response_async(user_input, session.turns, current_lang)
+
+        # Store the canonical English turn
+        turn = ChatTurn(user_input, response)
+        session.add(turn)
+
+        # If not in English, translate the response
+        if current_lang != "English":
+            try:
+                translated_response = await translate_text_async(response, current_lang, is_user_message=False)
+                turn.translations[current_lang] = [user_input, translated_response]
+            except Exception as e:
+                print(f"Error in translation: {e}")
+                record_error('translate_response')
+
+        pretranslate_turn(turn, current_lang)
+        return "", session.render(current_lang), session_id
+
+    except Exception as e:
+        print(f"Error in chat_with_gemini_async: {e}")
+        record_error('chat_with_gemini_async')
+        return "", chat_history or [], session_id
+
+async def stream_chat_with_gemini_async(user_input, chat_history, current_lang, session_id=None):
+    """Async streaming handler; the blocking stream is driven on a worker pool."""
+    stream = stream_chat_with_gemini(user_input, chat_history, current_lang, session_id)
+    async for update in iterate_in_executor(stream):
+        yield update
+
+@instrument_handler('update_language', language_arg=0)
+def update_language(selected_lang, current_chat, current_lang_state, session_id=None):
+    """Update the language of the chat interface."""
+    try:
+        # If already in this language, do nothing
+        if selected_lang == current_lang_state:
+            return current_chat, selected_lang, selected_lang.lower(), session_id
+
+        # Render the visible window from the stored turns, translating only unseen ones
+        session = session_store.load(session_id, current_chat)
+        session.language = selected_lang
+        rendered_chat = session.render(selected_lang)
+        active = "en" if selected_lang == "English" else selected_lang.lower()
+
+        return rendered_chat, selected_lang, active, session.id
+
+    except Exception as e:
+        print(f"Error in update_language: {e}")
+        record_error('update_language')
+        return current_chat, current_lang_state, current_lang_state.lower(), session_id
+
+async def update_language_async(selected_lang, current_chat, current_lang_state, session_id=None):
+    """Async wrapper so language switches never wait on a blocked handler thread."""
+    return await asyncio.to_thread(
+        update_language, selected_lang, current_chat, current_lang_state, session_id
     )
+
+def chat_with_gemini_translate(user_input, chat_history, current_lang, session_id=None):
+    if not user_input or not user_input.strip():
+        return "", chat_history or [], session_id
+
+    # Clean the user input
+    user_input = user_input.strip()
+
+    # Use the main chat function for translation
+    return chat_with_gemini(user_input, chat_history, current_lang, session_id)
+
+# Example questions shown under the chat (also used to pre-warm the response cache)
+EXAMPLE_QUESTIONS = [
+    ("Must-visit places in Visakhapatnam", "What are the must-visit places in Visakhapatnam?"),
+    ("3-day trip to Araku Valley", "Plan a 3-day trip to Araku Valley"),
+    ("Best time to visit Tirupati", "What is the best time to visit Tirupati?")
+]
+
+def create_app():
+    """Build the Gradio interface. Gradio is only imported when the UI is needed."""
+    import gradio as gr
+
+    # Create the Gradio interface
+    with gr.Blocks(
+        theme=gr.themes.Soft(
+            primary_hue="pink",
+            secondary_hue="orange",
+            neutral_hue="slate"
+        ),
+        css="""
+            .gradio-container {
+                max-width: 900px !important;
+                margin: 0 auto;
+                padding: 20px;
+            }
+            h1 {
+                background: linear-gradient(90deg, #F75768, #FB6957);
+                -webkit-background-clip: text;
+                -webkit-text-fill-color: transparent;
+                text-align: center;
+                margin-bottom: 10px !important;
+            }
+            .gradio-markdown p {
+                text-align: center;
+                margin-bottom: 20px !important;
+                color: #555;
+            }
+            .examples-container {
+                display: flex;
+                gap: 15px;
+                flex-wrap: wrap;
+                margin-bottom: 20px;
+            }
+            .example-box {
+                border-left: 4px solid #F75768 !important;
+                border-radius: 4px;
+                padding: 12px 16px !important;
+                margin: 0 !important;
+                transition: all 0.2s ease;
+                flex: 1;
+                min-width: 200px;
+                max-width: 100%;
+                box-sizing: border-box;
+                background: white;
+                box-shadow: 0 2px 6px rgba(0,0,0,0.05);
+            }
+            .example-box:hover {
+                transform: translateY(-2px);
+                box-shadow: 0 4px 12px rgba(0,0,0,0.1);
+                cursor: pointer;
+            }
+            .example-text {
+                background: linear-gradient(90deg, #F75768, #FB6957);
+                -webkit-background-clip: text;
+                -webkit-text-fill-color: transparent;
+                margin: 0 !important;
+                font-weight: 500;
+                font-size: 0.95em;
+                line-height: 1.4;
+            }
+            .example-label {
+                color: #666;
+                font-size: 1em;
+                margin-bottom: 15px !important;
+                font-weight: 600;
+                width: 100%;
+            }
+        """
+    ) as demo:
+        # Header with full-width logo as heading
+        gr.HTML("""
+        <div style="display: flex; flex-direction: column; align-items: center; margin: 0 auto 20px; max-width: 100%;">
+            <img 
+                src="https://huggingface.co/spaces/vidhyaS/Saanchari_AP/resolve/main/logo.png" 
+                alt="Saanchari" 
+                style="
+                    height: auto;
+                    width: 80%;
+                    max-width: 400px;
+                    object-fit: contain;
+                    margin: 0 auto 15px;
+                ">
+            <p style="text-align: center; color: #555; margin: 0; font-size: 1.1em;">Your expert travel assistant for Andhra Pradesh</p>
+        """)
+        
+        # Function to handle example question clicks
+        def submit_question(question, chat_history):
+            if chat_history is None:
+                chat_history = []
+            # Add user question to chat
+            chat_history.append((question, None))
+            # Get response from Gemini
+            response = get_gemini_response(question)
+            # Add response to chat
+            chat_history[-1] = (question, response)
+            return "", chat_history
+        
+        # Chat title and language selection in one row
+        with gr.Row(equal_height=True, variant="compact"):
+            gr.Markdown("### Chat with Saanchari")
+            
+            # Language selection buttons
+            with gr.Row(variant="compact"):
+                en_btn = gr.Button("EN", size="sm", variant="primary", min_width=50)
+                hi_btn = gr.Button("हिंदी", size="sm", min_width=50)
+                te_btn = gr.Button("తెలుగు", size="sm", min_width=50)
+        
+        # Main chat interface
+        chatbot = gr.Chatbot(height=400, show_label=False)
+        
+        # Chat controls row
+        with gr.Row():
+            # Chat input
+            user_input = gr.Textbox(
+                label="Ask me anything about travel in Andhra Pradesh",
+                placeholder="E.g., Best places to visit in Visakhapatnam?",
+                scale=4,
+                show_label=False
+            )
+            submit_btn = gr.Button("Send", variant="primary")
+        
+        # Example questions
+        with gr.Row():
+            # Example questions will go here
+            pass
+        
+        # Store the current question and language
+        current_question = gr.State("")
+        current_language = gr.State("English")
+        active_button = gr.State("en")
+        # Per-session ChatTurn records: canonical text plus translations per language
+        session_id = gr.State(None)
+        
+        def set_question(question):
+            return question, question
+        
+        # Example questions with click handlers
+        with gr.Row():
+            with gr.Column():
+                gr.Markdown("### Try asking me about:")
+                
+                with gr.Row():
+                    for btn_text, question in EXAMPLE_QUESTIONS:
+                        with gr.Row():
+                            btn = gr.Button(
+                                btn_text, 
+                                variant="secondary",
+                                min_width=200,
+                                size="sm"
+                            )
+                            btn.click(
+                                fn=set_question,
+                                inputs=[gr.State(question)],
+                                outputs=[user_input, current_question]
+                            )
     
-    # Also connect the submit button
-    submit_btn.click(
-        chat_with_gemini,
-        inputs=[user_input, chatbot, current_language],
-        outputs=[user_input, chatbot, current_language],
-        queue=False,
-        api_name="chat_click"
-    )
+        # Add some space
+        gr.HTML("<div style='margin-bottom: 20px;'></div>")
+        
+        # Add custom CSS
+        gr.HTML("""
+        <style>
+            .gradio-button {
+                margin: 0 2px !important;
+                border-radius: 4px !important;
+                min-width: 45px !important;
+                padding: 2px 6px !important;
+                font-size: 0.8em !important;
+            }
+            .gradio-button:hover {
+                transform: translateY(-2px);
+                box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+            }
+            .gradio-row {
+                align-items: center;
+                gap: 10px;
+            }
+            .gradio-markdown h3 {
+                margin: 0 !important;
+                padding: 8px 0;
+            }
+        </style>
+        """)
+        
+        # Handle chat interactions
+        chat_inputs = [user_input, chatbot]
+        chat_outputs = [user_input, chatbot]
+        
+        # This function is now replaced by the unified translate_text function above
+    
+        # Store the active button state
+        active_button = gr.State("en")
+    
+        # Set up button click handlers
+        en_btn.click(
+            fn=update_language_async,
+            inputs=[gr.State("English"), chatbot, current_language, session_id],
+            outputs=[chatbot, current_language, active_button, session_id],
+            api_name="set_english",
+            concurrency_limit=LANGUAGE_CONCURRENCY,
+            concurrency_id="language"
+        )
+    
+        hi_btn.click(
+            fn=update_language_async,
+            inputs=[gr.State("Hindi"), chatbot, current_language, session_id],
+            outputs=[chatbot, current_language, active_button, session_id],
+            api_name="set_hindi",
+            concurrency_limit=LANGUAGE_CONCURRENCY,
+            concurrency_id="language"
+        )
+    
+        te_btn.click(
+            fn=update_language_async,
+            inputs=[gr.State("Telugu"), chatbot, current_language, session_id],
+            outputs=[chatbot, current_language, active_button, session_id],
+            api_name="set_telugu",
+            concurrency_limit=LANGUAGE_CONCURRENCY,
+            concurrency_id="language"
+        )
+    
+        chat_handler = stream_chat_with_gemini_async if STREAM_RESPONSES else chat_with_gemini_async
+    
+        # Set up the chat interface
+        chat_msg = user_input.submit(
+            chat_handler,
+            inputs=[user_input, chatbot, current_language, session_id],
+            outputs=[user_input, chatbot, session_id],
+            api_name="chat_click",
+            concurrency_limit=CHAT_CONCURRENCY,
+            concurrency_id="chat"
+        )
+        
+        # Also connect the submit button
+        submit_btn.click(
+            chat_handler,
+            inputs=[user_input, chatbot, current_language, session_id],
+            outputs=[user_input, chatbot, session_id],
+            api_name="chat_click",
+            concurrency_limit=CHAT_CONCURRENCY,
+            concurrency_id="chat"
+        )
+
+    # Queue every event; per-endpoint limits above override the default
+    demo.queue(default_concurrency_limit=QUEUE_CONCURRENCY, max_size=QUEUE_MAX_SIZE)
+    return demo
+
+def create_server(demo=None):
+    """Serve the Gradio UI at / and Prometheus metrics at /metrics from one FastAPI app."""
+    import gradio as gr
+    from fastapi import FastAPI
+    from fastapi.responses import PlainTextResponse
+
+    server = FastAPI()
+
+    @server.get("/metrics", response_class=PlainTextResponse)
+    def metrics_endpoint():
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+    return gr.mount_gradio_app(server, demo or create_app(), path="/")
+
+_demo = None
+
+def __getattr__(name):
+    """Build ``demo`` on first access so importing this module stays cheap."""
+    global _demo
+    if name == "demo":
+        if _demo is None:
+            _demo = create_app()
+        return _demo
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # For local testing
 if __name__ == "__main__":
-    demo.launch(share=True, server_name="0.0.0.0", server_port=7861)
+    # Fail fast on a missing key; the client itself is still created lazily
+    check_api_key()
+    if RESPONSE_CACHE_PREWARM:
+        # Answer the example questions in the background so startup is not delayed
+        threading.Thread(
+            target=response_cache.prewarm,
+            args=([question for _, question in EXAMPLE_QUESTIONS],),
+            daemon=True
+        ).start()
+    if METRICS_ENDPOINT:
+        # Gradio's share link is not available when mounted; serve directly instead
+        import uvicorn
+        uvicorn.run(create_server(), host="0.0.0.0", port=7861)
+    else:
+        create_app().launch(share=True, server_name="0.0.0.0", server_port=7861)
@@ -0,0 +1,18 @@
+"""
+Benchmarks for the Saanchari Gradio app.
+
+Run them from ``src/attached_assets`` as modules, e.g.::
+
+    python -m benchmarks.startup
+    python -m benchmarks.sessions
+    python -m benchmarks.load
+    python -m benchmarks.prompt
+    python -m benchmarks.budgets
+
+The offline benchmarks swap Gemini and the translator for the fakes in
+``benchmarks.fakes`` via ``configure_backends``, so they need no network.
+The load test also needs gradio_client.
+"""
+
+# The app lives in a single file next to this package
+APP_MODULE = "app_1752630946952"
@@ -0,0 +1,111 @@
+"""
+Before/after benchmark for the per-query-class generation budgets.
+
+Runs the same questions with QUERY_BUDGETS_ENABLED off (every question gets
+an unbounded call, the old behavior) and on. For each query class it
+reports the Gemini call latency, the output tokens and how many answers
+were cut short. The translated characters show what a long answer costs a
+second time in Hindi and Telugu.
+
+Offline, the default, uses ``FakeGeminiModel``. ``--sentences`` sets the
+range of answer lengths, and the fake honors ``max_output_tokens``.
+``--live`` measures the real API and needs GEMINI_API_KEY.
+
+Usage::
+
+    python -m benchmarks.budgets --questions 60
+    python -m benchmarks.budgets --live --questions 12 --json
+"""
+
+import argparse
+import importlib
+import json
+import statistics
+
+from benchmarks import APP_MODULE
+from benchmarks.fakes import FakeGeminiModel, FakeTranslatorFactory
+from benchmarks.sessions import QUESTIONS, percentile
+
+
+def run(app, enabled, questions, args):
+    """Answer and translate every question with budgets on or off; summarize per class."""
+    app.QUERY_BUDGETS_ENABLED = enabled
+    translator = FakeTranslatorFactory(latency=0.0)
+    if args.live:
+        app.configure_backends(translator_class=translator)
+    else:
+        app.configure_backends(
+            model=FakeGeminiModel(
+                first_token_latency=args.first_token_latency,
+                token_latency=args.token_latency,
+                sentences=tuple(args.sentences),
+            ),
+            translator_class=translator,
+        )
+        # The fake needs no client-side rate limit, which would dominate the timings
+        app.gemini_upstream.bucket = app.TokenBucket(rate=1e9, capacity=10 ** 9)
+    app.response_cache.clear()
+    app.translation_cache.clear()
+    app.gemini_usage.clear()
+    app.query_latencies.clear()
+    app.metrics.reset()
+
+    output_tokens = {}
+    for question in questions:
+        query_class = app.classify_query(question)
+        usage_before = len(app.gemini_usage)
+        answer = app.get_gemini_response(question)
+        app.translate_text(answer, "Hindi")
+        if len(app.gemini_usage) > usage_before:
+            output_tokens.setdefault(query_class, []).append(app.gemini_usage[-1]["output_tokens"])
+
+    report = {}
+    for query_class, row in app.query_class_stats().items():
+        latencies = list(app.query_latencies[query_class])
+        tokens = output_tokens.get(query_class, [0])
+        report[query_class] = {
+            "calls": row["count"],
+            "latency_p50_ms": percentile(latencies, 0.50) * 1000,
+            "latency_p95_ms": percentile(latencies, 0.95) * 1000,
+            "output_tokens_mean": statistics.fmean(tokens),
+            "truncated": row["truncated"],
+        }
+    return {"classes": report, "translated_characters": translator.characters}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=60)
+    parser.add_argument("--live", action="store_true", help="call the real Gemini API")
+    parser.add_argument("--first-token-latency", type=float, default=0.05, help="seconds (offline)")
+    parser.add_argument("--token-latency", type=float, default=0.002, help="seconds per piece (offline)")
+    parser.add_argument("--sentences", type=int, nargs=2, default=[3, 120],
+                        help="range of answer lengths in sentences (offline)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    app = importlib.import_module(APP_MODULE)
+    if args.live:
+        app.check_api_key()
+    app.knowledge_pack.path = ""
+    # Numbered variants, so every question is a fresh Gemini call
+    questions = [f"{QUESTIONS[index % len(QUESTIONS)]} ({index})" for index in range(args.questions)]
+    report = {
+        "unbounded": run(app, False, questions, args),
+        "budgets": run(app, True, questions, args),
+    }
+
+    if args.json:
+        print(json.dumps({"config": vars(args), "runs": report}, indent=2))
+        return
+
+    print(f"{'run':<12}{'class':<12}{'calls':>7}{'p50 ms':>9}{'p95 ms':>9}{'out tok':>9}{'truncated':>11}")
+    for name, run_report in report.items():
+        for query_class, row in sorted(run_report["classes"].items()):
+            print(f"{name:<12}{query_class:<12}{row['calls']:>7}{row['latency_p50_ms']:>9.0f}"
+                  f"{row['latency_p95_ms']:>9.0f}{row['output_tokens_mean']:>9.0f}{row['truncated']:>11}")
+        print(f"{name:<12}translated characters: {run_report['translated_characters']}")
+
+
+if __name__ == "__main__":
+    main()
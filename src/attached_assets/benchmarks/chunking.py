@@ -0,0 +1,135 @@
+"""
+Micro-benchmark: the streaming chunker against the original list-based splitter.
+
+``legacy_split_into_chunks`` is a verbatim copy of split_into_chunks before it
+became a wrapper around ``iter_chunks``. The benchmark compares both on
+multi-megabyte inputs: ordinary prose, prose with very long run-on
+sentences (the word-splitting path), and Devanagari text. It reports
+wall time, time to the first chunk and peak memory.
+
+Usage::
+
+    python -m benchmarks.chunking --megabytes 1 4 --chunk-size 4500
+"""
+
+import argparse
+import importlib
+import re
+import time
+import tracemalloc
+
+from benchmarks import APP_MODULE
+from benchmarks.fakes import ANSWER_SENTENCES
+
+
+def legacy_split_into_chunks(text, max_chunk_size=15000):
+    """Split text into chunks of maximum size, trying to break at sentence boundaries."""
+    if not text:
+        return []
+
+    # Try to split at sentence boundaries first
+    sentences = re.split(r'(?<=[.!?])\s+', text)
+
+    chunks = []
+    current_chunk = []
+    current_length = 0
+
+    for sentence in sentences:
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+
+        # If a single sentence is too long, we need to split it
+        if len(sentence) > max_chunk_size:
+            # Split by words if the sentence is too long
+            words = sentence.split(' ')
+            temp_chunk = []
+            temp_length = 0
+
+            for word in words:
+                if temp_length + len(word) + 1 > max_chunk_size and temp_chunk:
+                    chunks.append(' '.join(temp_chunk))
+                    temp_chunk = [word]
+                    temp_length = len(word)
+                else:
+                    temp_chunk.append(word)
+                    temp_length += len(word) + 1
+
+            if temp_chunk:
+                if current_chunk and (current_length + len(' '.join(temp_chunk)) + 1) <= max_chunk_size:
+                    current_chunk.extend(temp_chunk)
+                    current_length += len(' '.join(temp_chunk)) + 1
+                else:
+                    if current_chunk:
+                        chunks.append(' '.join(current_chunk))
+                    current_chunk = temp_chunk
+                    current_length = len(' '.join(temp_chunk))
+        else:
+            if current_chunk and (current_length + len(sentence) + 1) > max_chunk_size:
+                chunks.append(' '.join(current_chunk))
+                current_chunk = [sentence]
+                current_length = len(sentence)
+            else:
+                current_chunk.append(sentence)
+                current_length += len(sentence) + 1
+
+    if current_chunk:
+        chunks.append(' '.join(current_chunk))
+
+    return chunks
+
+
+def make_inputs(megabytes):
+    """Build the benchmark corpora at roughly the requested size."""
+    target = int(megabytes * 1024 * 1024)
+    prose = " ".join(ANSWER_SENTENCES)
+    run_on = " ".join(sentence.rstrip(".") for sentence in ANSWER_SENTENCES) + ","
+    devanagari = "विशाखापत्तनम अपने समुद्र तटों के लिए प्रसिद्ध है। अराकू घाटी कॉफी बागानों के लिए जानी जाती है। "
+    return {
+        "prose": (prose + " ") * (target // (len(prose) + 1) + 1),
+        "run_on_sentences": ((run_on + " ") * 400 + ". ") * (target // ((len(run_on) + 1) * 400) + 1),
+        "devanagari": devanagari * (target // len(devanagari.encode("utf-8")) + 1),
+    }
+
+
+def measure(split, text):
+    """Return (total seconds, seconds to first chunk, peak bytes, chunk count)."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    chunks = split(text)
+    iterator = iter(chunks)
+    first = next(iterator, None)
+    first_at = time.perf_counter() - started
+    count = 0 if first is None else 1 + sum(1 for _ in iterator)
+    total = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return total, first_at, peak, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--megabytes", type=float, nargs="+", default=[1, 4])
+    parser.add_argument("--chunk-size", type=int, default=4500)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    app = importlib.import_module(APP_MODULE)
+    candidates = {
+        "legacy list": lambda text: legacy_split_into_chunks(text, args.chunk_size),
+        "iter_chunks": lambda text: app.iter_chunks(text, args.chunk_size),
+        "iter_chunks bytes": lambda text: app.iter_chunks(text, args.chunk_size, unit="bytes"),
+    }
+
+    print(f"{'input':<26}{'splitter':<20}{'total ms':>10}{'first ms':>10}{'peak MB':>9}{'chunks':>8}")
+    for megabytes in args.megabytes:
+        for name, text in make_inputs(megabytes).items():
+            for label, split in candidates.items():
+                runs = [measure(split, text) for _ in range(args.repeats)]
+                total, first_at, peak, count = min(runs)
+                print(f"{f'{name} {megabytes:g}MB':<26}{label:<20}{total * 1000:>10.1f}"
+                      f"{first_at * 1000:>10.2f}{peak / 1024 / 1024:>9.1f}{count:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Offline stand-ins for Gemini and the translator.
+
+Both fakes are deterministic for a given seed, count their calls and can be
+installed into the app with ``app.configure_backends``.
+"""
+
+import asyncio
+import hashlib
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+# Sentences the fake model draws its answers from
+ANSWER_SENTENCES = [
+    "Visakhapatnam is known for its beaches, including RK Beach and Rushikonda.",
+    "The Araku Valley is a cool hill station famous for coffee plantations and tribal culture.",
+    "Borra Caves are among the largest limestone caves in India.",
+    "The best time to visit is between October and March when the weather is pleasant.",
+    "Tirumala Venkateswara Temple in Tirupati draws millions of pilgrims every year.",
+    "Try Andhra biryani, pesarattu and the famous Guntur chilli dishes.",
+    "Kondapalli toys and Kalamkari textiles make great souvenirs.",
+    "APSRTC buses and trains connect most tourist towns at budget-friendly prices.",
+    "Book accommodation early during Sankranti and the Tirupati Brahmotsavam festival.",
+    "Day 1: explore the city. Day 2: take the scenic train to Araku. Day 3: visit the caves.",
+]
+
+# Keeps [[n]] batch markers intact, like a real translator usually does
+MARKER = re.compile(r'(\[\[\s*\d+\s*\]\])')
+
+
+class FakeGeminiModel:
+    """
+    Deterministic replacement for genai.GenerativeModel.
+
+    Answers are built from ANSWER_SENTENCES, chosen by a hash of the prompt,
+    so repeated prompts produce the same text. ``first_token_latency`` is
+    paid before the first piece of output and ``token_latency`` before every
+    following streamed piece; non-streaming calls pay the total at once.
+
+    A ``system_instruction`` counts towards the input tokens like the real
+    API reports them. With ``cached_instruction`` its tokens are reported
+    as cached content and skip ``input_token_latency``, which is charged
+    per uncached input token before the first piece.
+
+    ``generation_config={'max_output_tokens': n}`` cuts the answer at about
+    n tokens and reports ``finish_reason='MAX_TOKENS'`` like the real API.
+    """
+
+    def __init__(self, first_token_latency=0.3, token_latency=0.02, sentences=(3, 8),
+                 failure_rate=0.0, seed=0, system_instruction=None, cached_instruction=False,
+                 input_token_latency=0.0):
+        self.first_token_latency = first_token_latency
+        self.token_latency = token_latency
+        self.sentences = sentences
+        self.failure_rate = failure_rate
+        self.system_instruction = system_instruction
+        self.cached_instruction = cached_instruction
+        self.input_token_latency = input_token_latency
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def factory(cls, **kwargs):
+        """A ``model_factory`` for configure_backends: one fake per system instruction."""
+        return lambda system_instruction: cls(system_instruction=system_instruction, **kwargs)
+
+    def _answer(self, prompt):
+        digest = int(hashlib.sha256(str(prompt).encode("utf-8")).hexdigest(), 16)
+        count = self.sentences[0] + digest % (self.sentences[1] - self.sentences[0] + 1)
+        return " ".join(
+            ANSWER_SENTENCES[(digest >> (4 * i)) % len(ANSWER_SENTENCES)] for i in range(count)
+        )
+
+    def _start_call(self):
+        with self._lock:
+            self.calls += 1
+            failed = self._random.random() < self.failure_rate
+        if failed:
+            raise RuntimeError("fake Gemini error (503 Service Unavailable)")
+
+    def _pieces(self, text):
+        # Roughly token-sized pieces, as the real stream delivers them
+        return re.findall(r'\S+\s*', text)
+
+    def _limit(self, text, generation_config):
+        # Returns (text, finish_reason) under the max_output_tokens cap
+        limit = (generation_config or {}).get("max_output_tokens")
+        if limit and (len(text) + 3) // 4 > limit:
+            return text[: limit * 4], "MAX_TOKENS"
+        return text, "STOP"
+
+    def _chunk(self, text, usage=None, finish_reason=None):
+        candidates = [SimpleNamespace(finish_reason=finish_reason)] if finish_reason else []
+        return SimpleNamespace(text=text, usage_metadata=usage, candidates=candidates)
+
+    def generate_content(self, prompt, stream=False, generation_config=None, **kwargs):
+        self._start_call()
+        text, finish_reason = self._limit(self._answer(prompt), generation_config)
+        usage = self._usage(prompt, text)
+        if stream:
+            return self._stream(text, usage, finish_reason)
+        pieces = self._pieces(text)
+        time.sleep(self._first_piece_latency(usage) + self.token_latency * max(len(pieces) - 1, 0))
+        return self._chunk(text, usage, finish_reason)
+
+    def _stream(self, text, usage, finish_reason):
+        pieces = self._pieces(text)
+        for index, piece in enumerate(pieces):
+            time.sleep(self._first_piece_latency(usage) if index == 0 else self.token_latency)
+            # Like the real stream, the last chunk carries the usage totals and finish reason
+            last = index == len(pieces) - 1
+            yield self._chunk(piece, usage if last else None, finish_reason if last else None)
+
+    async def generate_content_async(self, prompt, stream=False, generation_config=None, **kwargs):
+        self._start_call()
+        text, finish_reason = self._limit(self._answer(prompt), generation_config)
+        usage = self._usage(prompt, text)
+        if stream:
+            return self._stream_async(text, usage, finish_reason)
+        pieces = self._pieces(text)
+        await asyncio.sleep(self._first_piece_latency(usage) + self.token_latency * max(len(pieces) - 1, 0))
+        return self._chunk(text, usage, finish_reason)
+
+    async def _stream_async(self, text, usage, finish_reason):
+        pieces = self._pieces(text)
+        for index, piece in enumerate(pieces):
+            await asyncio.sleep(self._first_piece_latency(usage) if index == 0 else self.token_latency)
+            last = index == len(pieces) - 1
+            yield self._chunk(piece, usage if last else None, finish_reason if last else None)
+
+    def _first_piece_latency(self, usage):
+        uncached = usage.prompt_token_count - usage.cached_content_token_count
+        return self.first_token_latency + self.input_token_latency * uncached
+
+    def _usage(self, prompt, text):
+        instruction_tokens = (len(self.system_instruction) + 3) // 4 if self.system_instruction else 0
+        return SimpleNamespace(
+            prompt_token_count=(len(str(prompt)) + 3) // 4 + instruction_tokens,
+            cached_content_token_count=instruction_tokens if self.cached_instruction else 0,
+            candidates_token_count=(len(text) + 3) // 4,
+        )
+
+
+class FakeTranslatorFactory:
+    """
+    Callable used in place of GoogleTranslator: ``factory(source=..., target=...)``.
+
+    Every translate() call sleeps ``latency`` seconds plus ``per_char_latency``
+    per character, fails with probability ``failure_rate``, and otherwise
+    tags each word with the target code (``word~hi``) while keeping batch
+    markers and line breaks intact.
+    """
+
+    def __init__(self, latency=0.15, per_char_latency=0.0, failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.per_char_latency = per_char_latency
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self.characters = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self, source="auto", target="en"):
+        return _FakeTranslator(self, target)
+
+    def translate(self, text, target):
+        with self._lock:
+            self.calls += 1
+            self.characters += len(text)
+            failed = self._random.random() < self.failure_rate
+        time.sleep(self.latency + self.per_char_latency * len(text))
+        if failed:
+            raise RuntimeError("fake translator error (429 Too Many Requests)")
+        parts = MARKER.split(text)
+        return "".join(
+            part if MARKER.fullmatch(part) else re.sub(r'(\S+)', rf'\1~{target}', part)
+            for part in parts
+        )
+
+
+class _FakeTranslator:
+    def __init__(self, factory, target):
+        self._factory = factory
+        self._target = target
+
+    def translate(self, text):
+        return self._factory.translate(text, self._target)
@@ -0,0 +1,273 @@
+"""
+Load test for the Gradio API endpoints.
+
+Virtual users drive ``chat_click``, ``set_english``, ``set_hindi`` and
+``set_telugu`` through gradio_client, so every request goes through the
+real queue, concurrency groups and session state. Each user has its own
+client session. The chat handler is registered twice, once for the
+textbox submit and once for the Send button, and Gradio exposes the
+second one as ``chat_click_1``. Users pick between the two at random, and
+the report shows them separately.
+
+By default the app is started in-process on a local port with the fake
+backends from ``benchmarks.fakes``. Pass ``--url`` to load an already
+running replica instead (its own backends are used). The run goes through
+one stage per ``--concurrency`` level. Each stage reports:
+
+- throughput and error rate
+- latency percentiles per endpoint
+- queue depth: jobs waiting client-side, the largest queue size Gradio
+  reported, and handlers in flight (in-process only)
+
+Usage::
+
+    python -m benchmarks.load --concurrency 4 8 16 32 --duration 20
+    python -m benchmarks.load --mix switch-heavy --think-time 0.5 --json
+    python -m benchmarks.load --url http://127.0.0.1:7861/ --concurrency 16 --duration 60
+"""
+
+import argparse
+import importlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+
+from benchmarks import APP_MODULE
+from benchmarks.fakes import FakeGeminiModel, FakeTranslatorFactory
+from benchmarks.sessions import QUESTIONS, Recorder, percentile, reset_app_state
+
+# Both registrations of the chat handler
+CHAT_ENDPOINTS = ("/chat_click", "/chat_click_1")
+
+# Relative weights of each operation per workload
+MIXES = {
+    "mixed": {"chat": 0.6, "set_hindi": 0.15, "set_telugu": 0.15, "set_english": 0.1},
+    "chat-heavy": {"chat": 0.9, "set_hindi": 0.04, "set_telugu": 0.04, "set_english": 0.02},
+    "switch-heavy": {"chat": 0.25, "set_hindi": 0.3, "set_telugu": 0.3, "set_english": 0.15},
+}
+
+QUEUED = {"STARTING", "JOINING_QUEUE", "IN_QUEUE"}
+RUNNING = {"SENDING_DATA", "PROCESSING", "ITERATING", "PROGRESS"}
+
+
+class QueueMonitor:
+    """Samples the state of in-flight jobs (and the app's in-flight gauge) at a fixed interval."""
+
+    def __init__(self, app=None, interval=0.1):
+        self.app = app
+        self.interval = interval
+        self.samples = []
+        self.max_queue_size = 0
+        self._jobs = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def track(self, job):
+        with self._lock:
+            self._jobs.add(job)
+
+    def untrack(self, job):
+        with self._lock:
+            self._jobs.discard(job)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                jobs = list(self._jobs)
+            states = Counter()
+            for job in jobs:
+                try:
+                    status = job.status()
+                except Exception:
+                    continue
+                states[status.code.name] += 1
+                if status.queue_size:
+                    self.max_queue_size = max(self.max_queue_size, status.queue_size)
+            inflight = self.app.metrics.gauge_total("saanchari_inflight_requests") if self.app else None
+            self.samples.append((
+                sum(states[code] for code in QUEUED),
+                sum(states[code] for code in RUNNING),
+                inflight,
+            ))
+
+    def summary(self):
+        queued = [sample[0] for sample in self.samples] or [0]
+        running = [sample[1] for sample in self.samples] or [0]
+        summary = {
+            "queued_mean": sum(queued) / len(queued),
+            "queued_max": max(queued),
+            "running_mean": sum(running) / len(running),
+            "server_queue_size_max": self.max_queue_size,
+        }
+        inflight = [sample[2] for sample in self.samples if sample[2] is not None]
+        if inflight:
+            summary["inflight_mean"] = sum(inflight) / len(inflight)
+            summary["inflight_max"] = max(inflight)
+        return summary
+
+
+def start_local_server(args):
+    """Start the app in-process with fake backends; return (app, demo, url)."""
+    app = importlib.import_module(APP_MODULE)
+    app.configure_backends(
+        model=FakeGeminiModel(
+            first_token_latency=args.gemini_first_token,
+            token_latency=args.gemini_token_latency,
+            failure_rate=args.gemini_failure_rate,
+            seed=args.seed,
+        ),
+        translator_class=FakeTranslatorFactory(
+            latency=args.translator_latency,
+            failure_rate=args.translator_failure_rate,
+            seed=args.seed,
+        ),
+    )
+    app.knowledge_pack.path = ""
+    demo = app.create_app()
+    demo.launch(prevent_thread_lock=True, server_name="127.0.0.1", quiet=True)
+    return app, demo, demo.local_url
+
+
+def run_user(client, rng, mix, deadline, think_time, timeout, recorder, errors, monitor):
+    """Closed-loop virtual user: pick an operation, wait for it, think, repeat."""
+    operations, weights = zip(*mix.items())
+    chat = []
+    while time.perf_counter() < deadline:
+        operation = rng.choices(operations, weights)[0]
+        if operation == "chat":
+            api_name = rng.choice(CHAT_ENDPOINTS)
+            inputs = (rng.choice(QUESTIONS), chat)
+        else:
+            api_name = f"/{operation}"
+            inputs = (chat,)
+
+        started = time.perf_counter()
+        job = None
+        try:
+            job = client.submit(*inputs, api_name=api_name)
+            monitor.track(job)
+            result = job.result(timeout=timeout)
+            # chat_click returns (textbox, chatbot); the language buttons just the chatbot
+            chat = result[1] if operation == "chat" else result
+            recorder.add(api_name.lstrip("/"), time.perf_counter() - started)
+        except Exception as e:
+            errors[(api_name.lstrip("/"), type(e).__name__)] += 1
+        finally:
+            if job is not None:
+                monitor.untrack(job)
+
+        if think_time:
+            time.sleep(rng.expovariate(1 / think_time))
+
+
+def run_stage(clients, concurrency, args, app=None):
+    """Run ``concurrency`` users for ``args.duration`` seconds and summarize the stage."""
+    if app is not None and not args.warm:
+        reset_app_state(app)
+    recorder = Recorder()
+    errors = Counter()
+    monitor = QueueMonitor(app, interval=args.sample_interval)
+    mix = MIXES[args.mix]
+    deadline = time.perf_counter() + args.duration
+
+    monitor.start()
+    started = time.perf_counter()
+    users = [
+        threading.Thread(
+            target=run_user,
+            args=(clients[index], random.Random(args.seed * 1000 + index), mix, deadline,
+                  args.think_time, args.timeout, recorder, errors, monitor),
+        )
+        for index in range(concurrency)
+    ]
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    elapsed = time.perf_counter() - started
+    monitor.stop()
+
+    completed = sum(len(values) for values in recorder.samples.values())
+    failed = sum(errors.values())
+    all_latencies = [value for values in recorder.samples.values() for value in values]
+    return {
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "requests": completed + failed,
+        "throughput_rps": completed / elapsed,
+        "error_rate": failed / max(completed + failed, 1),
+        "errors": {f"{endpoint}: {kind}": count for (endpoint, kind), count in sorted(errors.items())},
+        "latency": recorder.summary(),
+        "overall_p50_ms": percentile(all_latencies, 0.50) * 1000,
+        "overall_p95_ms": percentile(all_latencies, 0.95) * 1000,
+        "queue": monitor.summary(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="load a running replica instead of an in-process app with fakes")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 8, 16, 32], help="users per stage")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per stage")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean seconds between a user's requests")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds before a request counts as failed")
+    parser.add_argument("--warm", action="store_true", help="keep caches between stages (in-process only)")
+    parser.add_argument("--sample-interval", type=float, default=0.1, help="seconds between queue samples")
+    parser.add_argument("--gemini-first-token", type=float, default=0.3, help="seconds")
+    parser.add_argument("--gemini-token-latency", type=float, default=0.01, help="seconds per piece")
+    parser.add_argument("--gemini-failure-rate", type=float, default=0.0)
+    parser.add_argument("--translator-latency", type=float, default=0.15, help="seconds per call")
+    parser.add_argument("--translator-failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    from gradio_client import Client
+
+    app = demo = None
+    url = args.url
+    if url is None:
+        app, demo, url = start_local_server(args)
+
+    try:
+        # One client, and so one Gradio session, per virtual user
+        clients = [Client(url, verbose=False) for _ in range(max(args.concurrency))]
+        stages = [run_stage(clients, concurrency, args, app) for concurrency in args.concurrency]
+    finally:
+        if demo is not None:
+            demo.close()
+
+    if args.json:
+        print(json.dumps({"config": vars(args), "url": url, "stages": stages}, indent=2))
+        return
+
+    print(f"{url}  mix={args.mix}  duration={args.duration:g}s/stage  think={args.think_time:g}s")
+    print(f"\n{'users':>6}{'req/s':>9}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}"
+          f"{'queued':>8}{'max q':>7}{'inflight':>10}")
+    for stage in stages:
+        queue = stage["queue"]
+        inflight = f"{queue['inflight_max']:g}" if "inflight_max" in queue else "-"
+        print(f"{stage['concurrency']:>6}{stage['throughput_rps']:>9.1f}{stage['error_rate']:>8.1%}"
+              f"{stage['overall_p50_ms']:>10.0f}{stage['overall_p95_ms']:>10.0f}"
+              f"{queue['queued_mean']:>8.1f}{queue['server_queue_size_max']:>7}{inflight:>10}")
+    for stage in stages:
+        print(f"\n{stage['concurrency']} users")
+        for name, row in stage["latency"].items():
+            print(f"  {name:<14}{row['count']:>7}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}")
+        for error, count in stage["errors"].items():
+            print(f"  error {error}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Before/after benchmark for how the system prompt is sent to Gemini.
+
+Runs the same questions under each prompt mode:
+
+- inline: SYSTEM_PROMPT is prepended to every request (the old behavior)
+- system_instruction: set once on the model (GEMINI_SYSTEM_INSTRUCTION)
+- cached_content: also stored as Gemini cached content (GEMINI_CACHED_CONTENT)
+
+For each mode it reports the input tokens Gemini counted per call, how many
+of them were served from cached content, and the call latency.
+
+Offline, the default, uses ``FakeGeminiModel.factory``, which accounts
+for tokens the way the API reports them. ``--input-token-latency`` models
+the cost of processing uncached input. ``--live`` measures the real API and
+needs GEMINI_API_KEY. Cached content also needs a caching-capable model
+(set GEMINI_MODEL_NAME) and a prompt above the minimum cache size.
+Otherwise that mode falls back to a plain system instruction, and the
+report shows no cached tokens.
+
+Usage::
+
+    python -m benchmarks.prompt --questions 40
+    python -m benchmarks.prompt --live --questions 10 --json
+"""
+
+import argparse
+import importlib
+import json
+import statistics
+
+from benchmarks import APP_MODULE
+from benchmarks.fakes import ANSWER_SENTENCES, FakeGeminiModel
+from benchmarks.sessions import QUESTIONS, percentile
+
+MODES = {
+    "inline": (False, False),
+    "system_instruction": (True, False),
+    "cached_content": (True, True),
+}
+
+
+def workload(count):
+    """Questions with and without earlier turns, so prompt sizes vary."""
+    history = [[question, " ".join(ANSWER_SENTENCES[:3])] for question in QUESTIONS[:3]]
+    return [
+        (f"{QUESTIONS[index % len(QUESTIONS)]} ({index})", history[: index % (len(history) + 1)])
+        for index in range(count)
+    ]
+
+
+def run_mode(app, mode, questions, args):
+    """Answer every question under one prompt mode and summarize Gemini's usage."""
+    app.GEMINI_SYSTEM_INSTRUCTION, app.GEMINI_CACHED_CONTENT = MODES[mode]
+    if args.live:
+        app._models.clear()
+    else:
+        app.configure_backends(model_factory=FakeGeminiModel.factory(
+            cached_instruction=app.GEMINI_CACHED_CONTENT,
+            first_token_latency=args.first_token_latency,
+            token_latency=0.0,
+            input_token_latency=args.input_token_latency,
+        ))
+        # The fake needs no client-side rate limit, which would dominate the timings
+        app.gemini_upstream.bucket = app.TokenBucket(rate=1e9, capacity=10 ** 9)
+    app.response_cache.clear()
+    app.gemini_usage.clear()
+
+    for question, history in questions:
+        app.get_gemini_response(question, history)
+
+    usage = list(app.gemini_usage)
+    seconds = [call["seconds"] for call in usage]
+    return {
+        "calls": len(usage),
+        "prompt_tokens_mean": statistics.fmean(call["prompt_tokens"] for call in usage) if usage else 0,
+        "cached_tokens_mean": statistics.fmean(call["cached_tokens"] for call in usage) if usage else 0,
+        "uncached_tokens_mean": statistics.fmean(
+            call["prompt_tokens"] - call["cached_tokens"] for call in usage
+        ) if usage else 0,
+        "latency_p50_ms": percentile(seconds, 0.50) * 1000,
+        "latency_p95_ms": percentile(seconds, 0.95) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=40)
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--live", action="store_true", help="call the real Gemini API")
+    parser.add_argument("--first-token-latency", type=float, default=0.05, help="seconds (offline)")
+    parser.add_argument("--input-token-latency", type=float, default=0.0002,
+                        help="seconds per uncached input token (offline)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    app = importlib.import_module(APP_MODULE)
+    if args.live:
+        app.check_api_key()
+    questions = workload(args.questions)
+    report = {mode: run_mode(app, mode, questions, args) for mode in args.modes}
+
+    if args.json:
+        print(json.dumps({"config": vars(args), "modes": report}, indent=2))
+        return
+
+    print(f"{'mode':<20}{'calls':>7}{'input tok':>11}{'cached':>9}{'uncached':>10}{'p50 ms':>9}{'p95 ms':>9}")
+    for mode, row in report.items():
+        print(f"{mode:<20}{row['calls']:>7}{row['prompt_tokens_mean']:>11.0f}{row['cached_tokens_mean']:>9.0f}"
+              f"{row['uncached_tokens_mean']:>10.0f}{row['latency_p50_ms']:>9.1f}{row['latency_p95_ms']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
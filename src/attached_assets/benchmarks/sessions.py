@@ -0,0 +1,271 @@
+"""
+Offline session-replay benchmark for the chat and translation hot paths.
+
+Gemini and the translator are replaced by the deterministic fakes in
+``benchmarks.fakes``, so no network access or API key is needed. The
+harness replays many sessions concurrently, each with N chat turns and M
+language switches. It reports latency percentiles per operation, throughput,
+and how many upstream calls were made.
+
+Usage::
+
+    python -m benchmarks.sessions --sessions 20 --turns 6 --switches 4 --concurrency 8
+    python -m benchmarks.sessions --stream --translator-failure-rate 0.1 --json
+"""
+
+import argparse
+import importlib
+import json
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import APP_MODULE
+from benchmarks.fakes import ANSWER_SENTENCES, FakeGeminiModel, FakeTranslatorFactory
+
+QUESTIONS = [
+    "What are the must-visit places in Visakhapatnam?",
+    "Plan a 3-day trip to Araku Valley",
+    "What is the best time to visit Tirupati?",
+    "best time to visit tirupati",
+    "What about hotels there?",
+    "Which local dishes should I try?",
+    "How do I get from Vijayawada to Amaravati?",
+    "Is Borra Caves worth a visit with kids?",
+]
+
+LANGUAGES = ["English", "Hindi", "Telugu"]
+
+# A question typed in Telugu
+NATIVE_MESSAGE = "విశాఖపట్నంలో చూడవలసిన ప్రదేశాలు ఏమిటి? అరకు లోయకు ఎలా వెళ్ళాలి?"
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+
+class Recorder:
+    """Thread-safe collection of latency samples per operation."""
+
+    def __init__(self):
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def add(self, operation, seconds):
+        with self._lock:
+            self.samples.setdefault(operation, []).append(seconds)
+
+    def summary(self):
+        return {
+            operation: {
+                "count": len(values),
+                "mean_ms": statistics.fmean(values) * 1000,
+                "p50_ms": percentile(values, 0.50) * 1000,
+                "p95_ms": percentile(values, 0.95) * 1000,
+                "p99_ms": percentile(values, 0.99) * 1000,
+            }
+            for operation, values in sorted(self.samples.items())
+        }
+
+
+def load_app(model, translator):
+    """Import the app and install the fake backends."""
+    app = importlib.import_module(APP_MODULE)
+    app.configure_backends(model=model, translator_class=translator)
+    return app
+
+
+def reset_app_state(app):
+    """Clear caches and upstream counters so each run starts cold."""
+    app.translation_cache.clear()
+    app.response_cache.clear()
+    app.metrics.reset()
+    app.session_store.clear()
+    for upstream in (app.translator_upstream, app.gemini_upstream):
+        upstream.counters.clear()
+        upstream.latencies.clear()
+        upstream.breaker.record_success()
+    for flight in (app.translator_flight, app.gemini_flight):
+        flight.leaders = flight.shared = 0
+    app.query_latencies.clear()
+
+
+def replay_session(app, rng, turns, switches, stream, recorder, think_time=0.0):
+    """
+    Replay one session: ``turns`` questions with ``switches`` language changes mixed in.
+
+    ``think_time`` seconds pass between operations, as a user reads the answer.
+    """
+    session_id = None
+    chat = []
+    language = "English"
+    switch_points = sorted(rng.randrange(turns + 1) for _ in range(switches))
+
+    for turn in range(turns + 1):
+        while switch_points and switch_points[0] == turn:
+            switch_points.pop(0)
+            time.sleep(think_time)
+            target = rng.choice([lang for lang in LANGUAGES if lang != language])
+            started = time.perf_counter()
+            chat, language, _, session_id = app.update_language(target, chat, language, session_id)
+            recorder.add(f"switch_to_{target.lower()}", time.perf_counter() - started)
+        if turn == turns:
+            break
+
+        question = rng.choice(QUESTIONS)
+        time.sleep(think_time)
+        started = time.perf_counter()
+        if stream:
+            first_output = None
+            for _, chat, session_id in app.stream_chat_with_gemini(
+                question, chat, language, session_id
+            ):
+                if first_output is None and chat and chat[-1][1]:
+                    first_output = time.perf_counter() - started
+            if first_output is not None:
+                recorder.add("chat_first_output", first_output)
+        else:
+            _, chat, session_id = app.chat_with_gemini(question, chat, language, session_id)
+        recorder.add(f"chat_{language.lower()}", time.perf_counter() - started)
+
+
+def run_micro_benchmarks(app, recorder, repeats=5):
+    """Time the building blocks on their own with cold caches."""
+    long_text = " ".join(ANSWER_SENTENCES * 200)
+    for _ in range(repeats):
+        started = time.perf_counter()
+        app.split_into_chunks(long_text, max_chunk_size=4500)
+        recorder.add("split_into_chunks_100k", time.perf_counter() - started)
+
+    history = [[question, " ".join(ANSWER_SENTENCES[:4])] for question in QUESTIONS]
+    for _ in range(repeats):
+        reset_app_state(app)
+        started = time.perf_counter()
+        app.translate_text(" ".join(ANSWER_SENTENCES), "Telugu")
+        recorder.add("translate_text", time.perf_counter() - started)
+
+        reset_app_state(app)
+        started = time.perf_counter()
+        app.translate_chat(history, "Hindi")
+        recorder.add("translate_chat_8_turns", time.perf_counter() - started)
+
+        # A Telugu user's own message needs no translator call
+        reset_app_state(app)
+        started = time.perf_counter()
+        app.translate_text(NATIVE_MESSAGE, "Telugu", is_user_message=True)
+        recorder.add("translate_text_native", time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=6, help="chat turns per session")
+    parser.add_argument("--switches", type=int, default=4, help="language switches per session")
+    parser.add_argument("--concurrency", type=int, default=8, help="sessions replayed in parallel")
+    parser.add_argument("--stream", action="store_true", help="use the streaming chat handler")
+    parser.add_argument("--think-time", type=float, default=0.0, help="seconds between a user's operations")
+    parser.add_argument("--gemini-first-token", type=float, default=0.3, help="seconds")
+    parser.add_argument("--gemini-token-latency", type=float, default=0.01, help="seconds per piece")
+    parser.add_argument("--gemini-failure-rate", type=float, default=0.0)
+    parser.add_argument("--translator-latency", type=float, default=0.15, help="seconds per call")
+    parser.add_argument("--translator-failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--knowledge-pack", default="", help="pack file to serve from (default: none)")
+    parser.add_argument("--skip-micro", action="store_true", help="skip the building-block timings")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    model = FakeGeminiModel(
+        first_token_latency=args.gemini_first_token,
+        token_latency=args.gemini_token_latency,
+        failure_rate=args.gemini_failure_rate,
+        seed=args.seed,
+    )
+    translator = FakeTranslatorFactory(
+        latency=args.translator_latency,
+        failure_rate=args.translator_failure_rate,
+        seed=args.seed,
+    )
+    app = load_app(model, translator)
+    app.knowledge_pack.path = args.knowledge_pack
+    recorder = Recorder()
+
+    if not args.skip_micro:
+        run_micro_benchmarks(app, recorder)
+
+    reset_app_state(app)
+    model.calls = translator.calls = translator.characters = 0
+    rngs = [random.Random(args.seed * 1000 + index) for index in range(args.sessions)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [
+            pool.submit(
+                replay_session, app, rng, args.turns, args.switches, args.stream, recorder, args.think_time
+            )
+            for rng in rngs
+        ]
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    operations = sum(
+        len(values) for name, values in recorder.samples.items()
+        if name.startswith(("chat_", "switch_")) and name != "chat_first_output"
+    )
+    report = {
+        "config": vars(args),
+        "elapsed_s": elapsed,
+        "throughput": {
+            "sessions_per_s": args.sessions / elapsed,
+            "operations_per_s": operations / elapsed,
+        },
+        "latency": recorder.summary(),
+        "upstream": {
+            "gemini_calls": model.calls,
+            "translator_calls": translator.calls,
+            "translator_characters": translator.characters,
+            "gemini": app.gemini_upstream.stats(),
+            "translator": app.translator_upstream.stats(),
+            "coalesced": {
+                "gemini": app.gemini_flight.stats(),
+                "translator": app.translator_flight.stats(),
+            },
+        },
+        "caches": {
+            "translation": app.translation_cache.stats(),
+            "response": app.response_cache.stats(),
+            "knowledge_pack": app.knowledge_pack.stats(),
+        },
+        "sessions": app.session_store.stats(),
+        "query_classes": app.query_class_stats(),
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+        return
+
+    print(f"{args.sessions} sessions x {args.turns} turns, {args.switches} switches, "
+          f"concurrency {args.concurrency}, stream={args.stream}")
+    print(f"elapsed {elapsed:.2f}s  {report['throughput']['sessions_per_s']:.2f} sessions/s  "
+          f"{report['throughput']['operations_per_s']:.2f} ops/s")
+    print(f"\n{'operation':<26}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, row in report["latency"].items():
+        print(f"{name:<26}{row['count']:>7}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}")
+    print(f"\nupstream calls: gemini {model.calls}, translator {translator.calls} "
+          f"({translator.characters} chars)")
+    print(f"coalesced calls: {report['upstream']['coalesced']}")
+    print(f"translation cache: {report['caches']['translation']}")
+    print(f"response cache: {report['caches']['response']}")
+    for query_class, row in report["query_classes"].items():
+        print(f"gemini {query_class}: {row['count']} calls, p50 {row['p50'] * 1000:.0f} ms, "
+              f"p95 {row['p95'] * 1000:.0f} ms, {row['truncated']} truncated")
+
+
+if __name__ == "__main__":
+    main()
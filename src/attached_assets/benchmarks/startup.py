@@ -0,0 +1,77 @@
+"""
+Startup-time benchmark.
+
+Each sample runs in a fresh interpreter so module caches do not hide the cost
+of a cold start. It reports:
+
+- import: importing the app module (no clients, no UI)
+- create_app: building the gr.Blocks interface
+- first_request: the first Gemini request, including lazy client setup.
+  It is skipped unless --live is given and GEMINI_API_KEY is set.
+
+Usage::
+
+    python -m benchmarks.startup --runs 5 [--live]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks import APP_MODULE
+
+# Executed in the child interpreter; prints one JSON line of timings
+CHILD_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import {module} as app
+timings = {{'import': time.perf_counter() - started}}
+
+started = time.perf_counter()
+try:
+    app.create_app()
+    timings['create_app'] = time.perf_counter() - started
+except ImportError as e:
+    timings['create_app_error'] = str(e)
+
+if {live}:
+    started = time.perf_counter()
+    app.get_gemini_response("What is the best time to visit Tirupati?")
+    timings['first_request'] = time.perf_counter() - started
+
+print(json.dumps(timings))
+"""
+
+def run_once(live):
+    """Run one cold start in a child interpreter and return its timings."""
+    script = CHILD_SCRIPT.format(module=APP_MODULE, live=bool(live))
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=app_dir, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="number of cold starts to measure")
+    parser.add_argument("--live", action="store_true", help="also time a first real Gemini request")
+    args = parser.parse_args()
+
+    live = args.live and bool(os.getenv("GEMINI_API_KEY"))
+    samples = [run_once(live) for _ in range(args.runs)]
+
+    for stage in ("import", "create_app", "first_request"):
+        values = [sample[stage] for sample in samples if stage in sample]
+        if values:
+            print(f"{stage:>14}: median {statistics.median(values) * 1000:8.1f} ms  "
+                  f"min {min(values) * 1000:8.1f} ms  max {max(values) * 1000:8.1f} ms")
+    errors = {sample['create_app_error'] for sample in samples if 'create_app_error' in sample}
+    for error in errors:
+        print(f"    create_app: skipped ({error})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Build the precomputed multilingual knowledge pack.
+
+Runs a curated set of common Andhra Pradesh questions through
+``get_gemini_response`` and ``translate_text`` for every language in
+``LANG_MAP`` and writes the results to the memory-mapped pack file that
+the app checks before calling Gemini. The file is replaced atomically, so
+it can be rebuilt on a schedule while the app is running, e.g. nightly::
+
+    0 3 * * * cd /path/to/src/attached_assets && python build_knowledge_pack.py
+
+Usage::
+
+    python build_knowledge_pack.py                      # needs GEMINI_API_KEY
+    python build_knowledge_pack.py --questions extra.txt --output /data/pack.bin
+    python build_knowledge_pack.py --offline            # fake backends, for testing
+
+Answers that come back as errors, and translations that fell back to the
+English text, are left out rather than baked into the pack.
+"""
+
+import argparse
+import importlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+APP_MODULE = "app_1752630946952"
+
+CURATED_QUESTIONS = [
+    "What are the must-visit places in Visakhapatnam?",
+    "Plan a 3-day trip to Araku Valley",
+    "What is the best time to visit Tirupati?",
+    "How do I get darshan tickets for Tirumala?",
+    "What are the best beaches in Visakhapatnam?",
+    "How do I reach Araku Valley from Visakhapatnam?",
+    "Is Borra Caves worth a visit?",
+    "What is the best time to visit Araku Valley?",
+    "Plan a 2-day trip to Tirupati",
+    "What are the top tourist places in Vijayawada?",
+    "What is special about Amaravati?",
+    "What are the must-try foods in Andhra Pradesh?",
+    "Which festivals are celebrated in Andhra Pradesh?",
+    "What are the best places to visit in Andhra Pradesh in winter?",
+    "Plan a week-long trip across Andhra Pradesh",
+    "What is Gandikota famous for?",
+    "How do I visit Srisailam temple?",
+    "What is Lepakshi famous for?",
+    "What souvenirs should I buy in Andhra Pradesh?",
+    "What are the best hill stations in Andhra Pradesh?",
+]
+
+
+def load_questions(app, paths):
+    """The curated set, the app's example questions and any extra question files."""
+    questions = list(CURATED_QUESTIONS)
+    questions.extend(question for _, question in app.EXAMPLE_QUESTIONS)
+    for path in paths:
+        with open(path, encoding="utf-8") as question_file:
+            questions.extend(line.strip() for line in question_file if line.strip())
+
+    # One entry per normalized question, keeping the first wording
+    unique = {}
+    for question in questions:
+        unique.setdefault(app.KnowledgePack.key(question), question)
+    return list(unique.values())
+
+
+def build_entry(app, question):
+    """Return ``{language: [question, answer]}``, or None if the answer failed."""
+    answer = app.get_gemini_response(question)
+    if not answer or answer.startswith("Error getting response from Gemini"):
+        print(f"Skipping {question!r}: {answer}")
+        return None
+
+    entry = {"English": [question, answer]}
+    for language, lang_code in app.LANG_MAP.items():
+        if lang_code == "en":
+            continue
+        fallbacks = app.metrics.counter_value(
+            "saanchari_translation_fallbacks_total", kind="chunk", language=lang_code
+        )
+        translated = [
+            app.translate_text(question, language, is_user_message=True),
+            app.translate_text(answer, language, is_user_message=False),
+        ]
+        if app.metrics.counter_value(
+            "saanchari_translation_fallbacks_total", kind="chunk", language=lang_code
+        ) != fallbacks:
+            # Another worker may have failed at the same moment; either way, retry next build
+            print(f"Skipping {language} for {question!r}: translation failed")
+            continue
+        entry[language] = translated
+    return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=None, help="pack file (default: KNOWLEDGE_PACK_PATH)")
+    parser.add_argument("--questions", nargs="*", default=[], help="extra files with one question per line")
+    parser.add_argument("--concurrency", type=int, default=4, help="questions built in parallel")
+    parser.add_argument("--offline", action="store_true", help="use the fake backends from benchmarks.fakes")
+    args = parser.parse_args()
+
+    app = importlib.import_module(APP_MODULE)
+    if args.offline:
+        from benchmarks.fakes import FakeGeminiModel, FakeTranslatorFactory
+        app.configure_backends(
+            model=FakeGeminiModel(first_token_latency=0.05, token_latency=0.0),
+            translator_class=FakeTranslatorFactory(latency=0.01),
+        )
+    else:
+        app.check_api_key()
+
+    # Answers built offline are served many times; give them the full length
+    app.QUERY_BUDGETS_ENABLED = False
+
+    output = args.output or app.KNOWLEDGE_PACK_PATH
+    if not output:
+        parser.error("no output path: pass --output or set KNOWLEDGE_PACK_PATH")
+
+    questions = load_questions(app, args.questions)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+        entries = dict(zip(questions, pool.map(lambda question: build_entry(app, question), questions)))
+    entries = {question: entry for question, entry in entries.items() if entry}
+
+    count = app.KnowledgePack.write(output, entries)
+    size = os.path.getsize(output)
+    print(f"Wrote {count}/{len(questions)} questions to {output} "
+          f"({size / 1024:.1f} KB) in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
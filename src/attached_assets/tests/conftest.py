@@ -0,0 +1,27 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+# The app is a single module next to this directory, like the benchmarks use it
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import APP_MODULE  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def app():
+    return importlib.import_module(APP_MODULE)
+
+
+@pytest.fixture
+def translation_backend(app, monkeypatch):
+    """Install a translation backend for one test, with cold caches."""
+    def install(backend):
+        monkeypatch.setattr(app, "_translation_backend", backend)
+        app.translation_cache.clear()
+        return backend
+
+    yield install
+    app.translation_cache.clear()
@@ -0,0 +1,51 @@
+class MarkerBackend:
+    """Translation backend that rewrites the packed request with ``rewrite``."""
+
+    name = "test"
+    upstream = None
+
+    def __init__(self, rewrite):
+        self.rewrite = rewrite
+        self.calls = 0
+
+    def translate(self, text, lang_code):
+        self.calls += 1
+        return self.rewrite(text)
+
+
+def tag(text):
+    return text.replace("hello", "namaste").replace("world", "duniya")
+
+
+def test_translate_packed_splits_intact_markers(app, translation_backend):
+    translation_backend(MarkerBackend(tag))
+    assert app._translate_packed(["hello", "world"], "hi") == ["namaste", "duniya"]
+
+
+def test_translate_packed_tolerates_marker_spacing(app, translation_backend):
+    translation_backend(MarkerBackend(lambda text: tag(text).replace("[[", "[[ ").replace("]]", " ]]")))
+    assert app._translate_packed(["hello", "world"], "hi") == ["namaste", "duniya"]
+
+
+def test_translate_packed_rejects_mangled_markers(app, translation_backend):
+    mangled = {
+        "dropped": lambda text: tag(text).replace("[[1]]", ""),
+        "reordered": lambda text: "\n".join(reversed(tag(text).split("\n"))),
+        "translated": lambda text: tag(text).replace("[[", "((").replace("]]", "))"),
+        "leading text": lambda text: "Note: " + tag(text),
+        "emptied": lambda text: tag(text).replace("duniya", ""),
+    }
+    for name, rewrite in mangled.items():
+        translation_backend(MarkerBackend(rewrite))
+        assert app._translate_packed(["hello", "world"], "hi") is None, name
+
+
+def test_translate_batch_falls_back_per_message(app, translation_backend, monkeypatch):
+    backend = translation_backend(MarkerBackend(lambda text: tag(text).replace("[[1]]", "")))
+    # Pack even though the test backend has no upstream
+    monkeypatch.setattr(backend, "upstream", app.translator_upstream)
+
+    results = app.translate_batch(["hello", "world"], "Hindi")
+
+    assert results == ["[हिंदी] namaste", "[हिंदी] duniya"]
+    assert backend.calls == 3
@@ -0,0 +1,31 @@
+import pytest
+
+PROSE = "Visakhapatnam has beaches. Araku has coffee! Is Borra worth it? यह सुंदर है। अंत॥ Done."
+
+
+@pytest.mark.parametrize("unit", ["chars", "bytes"])
+@pytest.mark.parametrize("size", [10, 25, 60, 1000])
+def test_chunks_respect_the_budget_and_keep_every_word(app, unit, size):
+    measure = (lambda text: len(text.encode("utf-8"))) if unit == "bytes" else len
+    chunks = list(app.iter_chunks(PROSE, size, unit=unit))
+
+    assert " ".join(chunks).split() == PROSE.split()
+    for chunk in chunks:
+        # Only a single word longer than the budget may exceed it
+        assert measure(chunk) <= size or " " not in chunk
+
+
+def test_chunks_break_at_sentence_boundaries(app):
+    chunks = list(app.iter_chunks(PROSE, 45))
+    assert chunks[0] == "Visakhapatnam has beaches. Araku has coffee!"
+    assert all(chunk.endswith(("!", "?", ".", "।", "॥")) for chunk in chunks)
+
+
+def test_iter_chunks_is_lazy(app):
+    chunks = app.iter_chunks("First sentence. " * 100000, 50)
+    assert next(chunks) == "First sentence. First sentence. First sentence."
+
+
+def test_split_into_chunks_matches_iter_chunks(app):
+    assert app.split_into_chunks(PROSE, 30) == list(app.iter_chunks(PROSE, 30))
+    assert app.split_into_chunks("") == []
@@ -0,0 +1,40 @@
+def long_answer(index):
+    return (f"Answer {index} starts here. " + "More detail about the place. " * 20).strip()
+
+
+def history(turns):
+    return [[f"Question {index}?", long_answer(index)] for index in range(turns)]
+
+
+def test_recent_turns_verbatim_older_turns_summarized(app):
+    context, info = app.build_conversation_context(history(6), token_budget=2000, recent_turns=2)
+
+    assert (info["verbatim_turns"], info["summarized_turns"], info["dropped_turns"]) == (2, 4, 0)
+    assert long_answer(5) in context and long_answer(4) in context
+    assert long_answer(3) not in context
+    assert "- User asked: Question 0? | You answered: Answer 0 starts here." in context
+    assert context.index("Earlier in this conversation") < context.index("Recent conversation")
+
+
+def test_budget_drops_the_oldest_turns(app):
+    context, info = app.build_conversation_context(history(40), token_budget=400, recent_turns=1)
+
+    assert info["context_tokens"] <= 400
+    assert info["verbatim_turns"] == 1
+    assert info["dropped_turns"] > 0
+    assert info["verbatim_turns"] + info["summarized_turns"] + info["dropped_turns"] == 40
+    # The newest turns survive, the oldest go
+    assert "Question 38?" in context
+    assert "Question 0?" not in context
+
+
+def test_history_pairs_strips_prefixes_and_skips_unanswered(app):
+    chat = [["[हिंदी] नमस्ते", "[हिंदी] जवाब"], ["Pending question", None], "junk"]
+    assert app.history_pairs(chat) == [("नमस्ते", "जवाब")]
+
+
+def test_build_prompt_reports_size(app):
+    app.prompt_stats.clear()
+    prompt = app.build_prompt("What about hotels?", history(2))
+    assert prompt.endswith("User's Question: What about hotels?")
+    assert app.prompt_stats[-1]["prompt_tokens"] == app.estimate_tokens(prompt)
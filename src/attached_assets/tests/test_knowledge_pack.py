@@ -0,0 +1,44 @@
+import os
+
+ENTRIES = {
+    "What is the best time to visit Tirupati?": {
+        "English": ["What is the best time to visit Tirupati?", "September to February."],
+        "Telugu": ["తిరుపతి సందర్శించడానికి ఉత్తమ సమయం ఏది?", "సెప్టెంబర్ నుండి ఫిబ్రవరి వరకు."],
+    },
+    "Plan a 3-day trip to Araku Valley": {
+        "English": ["Plan a 3-day trip to Araku Valley", "Day 1: Borra Caves."],
+    },
+}
+
+
+def test_write_and_get_round_trip(app, tmp_path):
+    path = str(tmp_path / "pack.bin")
+    assert app.KnowledgePack.write(path, ENTRIES) == 2
+    assert not os.path.exists(f"{path}.tmp")
+
+    pack = app.KnowledgePack(path)
+    for question, entry in ENTRIES.items():
+        assert pack.get(question) == entry
+    # Lookups go through normalize_question
+    assert pack.get("what is the best time to visit tirupati") == ENTRIES["What is the best time to visit Tirupati?"]
+    assert pack.get("Plan a 4-day trip to Araku Valley") is None
+    assert pack.stats() == {"hits": 3, "misses": 1, "entries": 2}
+
+
+def test_rebuilt_pack_is_picked_up(app, tmp_path):
+    path = str(tmp_path / "pack.bin")
+    app.KnowledgePack.write(path, {})
+    pack = app.KnowledgePack(path, reload_interval=0)
+    assert pack.get("Plan a 3-day trip to Araku Valley") is None
+
+    app.KnowledgePack.write(path, ENTRIES)
+    os.utime(path, ns=(1, 1))
+    assert pack.get("Plan a 3-day trip to Araku Valley") == ENTRIES["Plan a 3-day trip to Araku Valley"]
+
+
+def test_missing_or_foreign_file(app, tmp_path):
+    assert app.KnowledgePack(str(tmp_path / "missing.bin")).get("anything") is None
+
+    path = tmp_path / "foreign.bin"
+    path.write_bytes(b"NOPE" + bytes(8))
+    assert app.KnowledgePack(str(path)).get("anything") is None
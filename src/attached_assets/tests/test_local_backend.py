@@ -0,0 +1,62 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+@pytest.fixture
+def blocked_backend(app, monkeypatch):
+    """A local backend on one thread whose translations wait for ``release``."""
+    release = threading.Event()
+    started = []
+
+    def translate_in_worker(text, lang_code):
+        started.append(text)
+        release.wait()
+        return f"{text}~{lang_code}"
+
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(app, "_translate_in_worker", translate_in_worker)
+
+    def build(max_pending):
+        backend = app.LocalModelBackend("test-model", workers=1, timeout=0.05, max_pending=max_pending)
+        monkeypatch.setattr(backend, "_get_pool", lambda: pool)
+        return backend
+
+    yield build, release, started
+    release.set()
+    pool.shutdown(wait=True)
+
+
+def test_timed_out_translation_is_not_left_queued(blocked_backend):
+    build, release, started = blocked_backend
+    backend = build(max_pending=2)
+
+    with pytest.raises(TimeoutError):
+        backend._translate("first", "hi")
+    # Queued behind the first one, then abandoned
+    with pytest.raises(TimeoutError):
+        backend._translate("second", "hi")
+
+    release.set()
+    assert backend._translate("third", "hi") == "third~hi"
+    assert started == ["first", "third"]
+
+
+def test_outstanding_translations_are_bounded(blocked_backend):
+    build, release, started = blocked_backend
+    backend = build(max_pending=1)
+
+    with pytest.raises(TimeoutError):
+        backend._translate("first", "hi")
+    began = time.monotonic()
+    with pytest.raises(TimeoutError, match="queue"):
+        backend._translate("second", "hi")
+    assert time.monotonic() - began < 1
+
+    # The slot is freed once the running translation finishes
+    release.set()
+    time.sleep(0.05)
+    assert backend._translate("third", "hi") == "third~hi"
+    assert started == ["first", "third"]
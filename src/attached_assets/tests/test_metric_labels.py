@@ -0,0 +1,68 @@
+import asyncio
+from types import SimpleNamespace
+
+
+class StubModel:
+    """Streams a fixed answer in two pieces."""
+
+    def _chunks(self):
+        return [SimpleNamespace(text="Visit the "), SimpleNamespace(text="beaches.")]
+
+    def generate_content(self, prompt, stream=True, **options):
+        return iter(self._chunks())
+
+    async def generate_content_async(self, prompt, stream=True, **options):
+        async def chunks():
+            for chunk in self._chunks():
+                yield chunk
+        return chunks()
+
+
+def labelled(app, name, **labels):
+    """Lines of the rendered metrics for ``name`` that carry every label."""
+    wanted = [f'{key}="{value}"' for key, value in labels.items()]
+    return [
+        line for line in app.metrics.render().splitlines()
+        if line.startswith(name) and all(label in line for label in wanted)
+    ]
+
+
+def stub_gemini(app, monkeypatch):
+    monkeypatch.setattr(app, "get_model", lambda language="English": StubModel())
+    monkeypatch.setattr(app.knowledge_pack, "path", "")
+    app.response_cache.clear()
+    app.metrics.reset()
+
+
+def test_streamed_gemini_metrics_carry_the_language(app, monkeypatch):
+    stub_gemini(app, monkeypatch)
+    assert app.get_gemini_response("Which beaches should I visit?", language="Telugu") == "Visit the beaches."
+
+    assert app.metrics.counter_value(
+        "saanchari_cache_lookups_total", cache="response", result="miss", language="te"
+    ) == 1
+    assert app.metrics.counter_value(
+        "saanchari_upstream_events_total", upstream="gemini", event="calls", language="te"
+    ) == 1
+    for stage in ("gemini_call", "gemini_first_token"):
+        assert labelled(app, "saanchari_stage_seconds_count", stage=stage, language="te")
+    assert labelled(app, "saanchari_query_seconds_count", language="te")
+
+
+def test_async_gemini_metrics_carry_the_language(app, monkeypatch):
+    stub_gemini(app, monkeypatch)
+    answer = asyncio.run(app.get_gemini_response_async("Which beaches should I visit?", language="Hindi"))
+    assert answer == "Visit the beaches."
+
+    assert app.metrics.counter_value(
+        "saanchari_upstream_events_total", upstream="gemini", event="calls", language="hi"
+    ) == 1
+    assert labelled(app, "saanchari_stage_seconds_count", stage="gemini_call", language="hi")
+    assert labelled(app, "saanchari_query_seconds_count", language="hi")
+
+
+def test_handlers_are_labelled_with_the_language_code(app, monkeypatch):
+    stub_gemini(app, monkeypatch)
+    app.set_language("Hindi", [], "English", None)
+    assert labelled(app, "saanchari_stage_seconds_count", stage="handler", handler="set_language", language="hi")
+    assert not labelled(app, "saanchari_stage_seconds_count", language="Hindi")
@@ -0,0 +1,33 @@
+import pytest
+
+
+@pytest.mark.parametrize("question", [
+    "Plan a 3-day trip to Araku Valley",
+    "Two day itinerary for Vizag",
+    "अराकू घाटी की 3 दिन की यात्रा की योजना बनाएं",
+    "అరకు లోయకు 3 రోజుల పర్యటన ప్లాన్ చేయండి",
+])
+def test_trip_planning_is_itinerary(app, question):
+    assert app.classify_query(question) == "itinerary"
+
+
+@pytest.mark.parametrize("question", [
+    "What is the best time to visit Tirupati?",
+    "How far is Araku from Vizag?",
+    "Is Borra Caves open on Monday?",
+    "Entry fee for Kailasagiri",
+])
+def test_short_factual_questions_are_quick_facts(app, question):
+    assert app.classify_query(question) == "quick_fact"
+
+
+@pytest.mark.parametrize("question", [
+    "Can you suggest a detailed 10 stop road map for Vizag",
+    "Are there good places to stay, eat and shop in Vijayawada?",
+    "Where is Lepakshi and what should I see there in detail?",
+    "तिरुपति जाने का सबसे अच्छा समय क्या है?",
+    "తిరుపతి సందర్శించడానికి ఉత్తమ సమయం ఏది?",
+    "Tell me about the history of Amaravati",
+])
+def test_open_ended_and_non_latin_questions_are_general(app, question):
+    assert app.classify_query(question) == "general"
@@ -0,0 +1,56 @@
+import pytest
+
+
+@pytest.fixture
+def cache(app):
+    return app.ResponseCache(ttl=None)
+
+
+def test_normalize_question_keeps_indic_vowel_signs(app):
+    assert app.normalize_question("तिरुपति में दो दिन की यात्रा?") == "तिरुपति में दो दिन की यात्रा"
+    assert app.normalize_question("తిరుపతి ఎప్పుడు వెళ్ళాలి?") == "తిరుపతి ఎప్పుడు వెళ్ళాలి"
+    assert app.normalize_question("  What's the BEST time -- to visit?! ") == "what s the best time to visit"
+
+
+def test_exact_and_similar_hits(cache):
+    cache.set("What is the best time to visit Tirupati?", "winter")
+    assert cache.get("what is the best time to visit tirupati") == "winter"
+    assert cache.get("Best time to visit Tirupati") == "winter"
+    assert cache.stats()["exact_hits"] == 1
+    assert cache.stats()["similar_hits"] == 1
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("Plan a 3-day trip to Araku Valley", "Plan a 5-day trip to Araku Valley"),
+    ("Is Borra Caves worth a visit with kids?", "Is Borra Caves worth a visit without kids?"),
+    ("Is Borra Caves worth a visit with kids?", "Isn't Borra Caves worth a visit with kids?"),
+    ("What are the must-visit places in Visakhapatnam?", "must-visit places near Visakhapatnam"),
+    ("Best veg restaurants in Vijayawada", "Best non-veg restaurants in Vijayawada"),
+    ("विशाखापत्तनम के किले के बारे में बताइए", "विशाखापत्तनम की कला के बारे में बताइए"),
+    ("तिरुपति में दो दिन की यात्रा की योजना बनाएं", "तिरुपति में नौ दिन की यात्रा की योजना बनाएं"),
+])
+def test_questions_with_different_meanings_do_not_match(cache, cached, asked):
+    cache.set(cached, "cached answer")
+    assert cache.get(asked) is None
+
+
+def test_indic_questions_match_exactly(cache):
+    cache.set("विशाखापत्तनम के किले के बारे में बताइए", "forts")
+    assert cache.get("विशाखापत्तनम के किले के बारे में बताइए।") == "forts"
+
+
+def test_gemini_flight_key_tells_indic_prompts_apart(app):
+    fort = app.gemini_flight_key("विशाखापत्तनम के किले के बारे में बताइए", "Hindi")
+    art = app.gemini_flight_key("विशाखापत्तनम की कला के बारे में बताइए", "Hindi")
+    assert fort != art
+
+
+def test_knowledge_pack_tells_indic_questions_apart(app, tmp_path):
+    path = str(tmp_path / "pack.bin")
+    entry = {"Hindi": ["तिरुपति में दो दिन की यात्रा", "उत्तर"]}
+    app.KnowledgePack.write(path, {"तिरुपति में दो दिन की यात्रा": entry})
+    pack = app.KnowledgePack(path)
+
+    assert pack.get("तिरुपति में दो दिन की यात्रा?") == entry
+    assert pack.get("तिरुपति में दो दिन की योजना") is None
+    assert app.KnowledgePack.key("तिरुपति") != app.KnowledgePack.key("तरपत")
@@ -0,0 +1,44 @@
+class RecordingBackend:
+    """Translation backend that tags words and records what it was sent."""
+
+    name = "test"
+    upstream = None
+
+    def __init__(self):
+        self.sent = []
+
+    def translate(self, text, lang_code):
+        self.sent.append(text)
+        return text.replace("hello", "namaste").replace("world", "duniya")
+
+
+def test_script_ratios(app):
+    assert app.script_ratios("తిరుపతి") == {"hi": 0.0, "te": 1.0, "en": 0.0, "other": 0.0}
+    assert app.script_ratios("12:30 - 18:00") == {}
+
+
+def test_skip_reasons(app):
+    assert app.translation_skip_reason("తిరుపతి ఎప్పుడు వెళ్ళాలి?", "te") == "target_script"
+    assert app.translation_skip_reason("तिरुपति कब जाएं?", "hi") == "target_script"
+    # Mostly Telugu with English place names is already translated
+    assert app.translation_skip_reason("అరకు Valley లో coffee తోటలు చాలా అందంగా ఉంటాయి", "te") == "target_script"
+    assert app.translation_skip_reason("12:30 - 18:00", "te") == "no_letters"
+    assert app.translation_skip_reason("https://tirumala.org", "hi") == "code"
+    assert app.translation_skip_reason("తిరుపతి ఎప్పుడు వెళ్ళాలి?", "hi") is None
+    assert app.translation_skip_reason("Best time to visit Tirupati?", "te") is None
+
+
+def test_text_in_target_script_is_not_sent(app, translation_backend):
+    backend = translation_backend(RecordingBackend())
+    assert app.translate_chunk("తిరుపతి ఎప్పుడు వెళ్ళాలి?", "te") == "తిరుపతి ఎప్పుడు వెళ్ళాలి?"
+    assert app.translate_chunk("12:30 - 18:00", "te") == "12:30 - 18:00"
+    assert app.translate_batch(["తిరుపతి ఎప్పుడు?"], "Telugu") == ["[తెలుగు] తిరుపతి ఎప్పుడు?"]
+    assert backend.sent == []
+
+
+def test_code_is_kept_out_of_the_request(app, translation_backend):
+    backend = translation_backend(RecordingBackend())
+    assert app.translate_chunk("hello https://example.com/world world", "hi") == (
+        "namaste https://example.com/world duniya"
+    )
+    assert backend.sent == ["hello", "world"]
@@ -0,0 +1,65 @@
+import time
+
+
+def test_session_keeps_at_most_max_turns(app):
+    session = app.Session("s", max_turns=3)
+    for index in range(5):
+        session.add(app.ChatTurn(f"q{index}", f"a{index}"))
+    assert [turn.user for turn in session.turns] == ["q2", "q3", "q4"]
+    assert session.render("English", window=2) == [["q3", "a3"], ["q4", "a4"]]
+
+
+def test_unknown_session_is_rebuilt_from_the_visible_chat(app):
+    store = app.SessionStore(max_turns=2)
+    session = store.load("unknown", [["[हिंदी] q0", "[हिंदी] a0"], ["q1", "a1"], ["q2", "a2"]])
+
+    assert session.id != "unknown"
+    assert [(turn.user, turn.bot) for turn in session.turns] == [("q1", "a1"), ("q2", "a2")]
+    assert store.load(session.id) is session
+
+
+def test_least_recently_used_sessions_are_evicted(app):
+    store = app.SessionStore(max_sessions=2)
+    first = store.load(None)
+    second = store.load(None)
+    store.load(first.id)
+    store.load(None)
+
+    assert store.stats()["sessions"] == 2
+    assert store.load(first.id) is first
+    assert store.load(second.id) is not second
+
+
+def test_idle_sessions_expire(app):
+    store = app.SessionStore(ttl=0.05)
+    session = store.load(None)
+    time.sleep(0.06)
+    assert store.load(session.id) is not session
+    assert store.stats()["sessions"] == 1
+
+
+class UpperBackend:
+    name = "test"
+    upstream = None
+
+    def translate(self, text, lang_code):
+        return text.upper()
+
+
+def test_language_switch_during_a_stream_is_kept(app, monkeypatch, translation_backend):
+    translation_backend(UpperBackend())
+    monkeypatch.setattr(app, "answer_from_knowledge_pack", lambda *args: None)
+    monkeypatch.setattr(app, "stream_gemini_response", lambda *args: iter(["Visit", "Visit the beaches."]))
+    app.session_store.clear()
+
+    stream = app.stream_chat_with_gemini("where to go?", [], "English", None)
+    _, chat, session_id = next(stream)
+    assert chat == [["where to go?", ""]]
+
+    # The user picks Hindi before the answer has finished
+    app.update_language("Hindi", chat, "English", session_id)
+    updates = list(stream)
+
+    assert all(len(update) == 3 for update in updates)
+    assert updates[-1][1] == [["[हिंदी] WHERE TO GO?", "[हिंदी] VISIT THE BEACHES."]]
+    assert app.session_store.load(session_id).language == "Hindi"
@@ -0,0 +1,184 @@
+import asyncio
+import threading
+import time
+
+
+def test_do_shares_one_call(app):
+    flight = app.SingleFlight("test")
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return "answer"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while flight.stats()["shared"] < 3:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["answer"] * 4
+    assert len(calls) == 1
+    assert flight.stats() == {"leaders": 1, "shared": 3, "in_flight": 0}
+
+
+def test_do_shares_errors(app):
+    flight = app.SingleFlight("test")
+    release = threading.Event()
+
+    def failing():
+        release.wait(5)
+        raise RuntimeError("upstream down")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do("k", failing)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while flight.stats()["shared"] < 2:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == ["upstream down"] * 3
+
+
+def test_do_async_shares_one_call(app):
+    flight = app.SingleFlight("test")
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async("k", slow) for _ in range(4)))
+
+    assert asyncio.run(main()) == ["answer"] * 4
+    assert len(calls) == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_do_async_leader_cancellation_spares_followers(app):
+    flight = app.SingleFlight("test")
+
+    async def slow():
+        await asyncio.sleep(0.1)
+        return "answer"
+
+    async def main():
+        leader = asyncio.create_task(flight.do_async("k", slow))
+        follower = asyncio.create_task(flight.do_async("k", slow))
+        await asyncio.sleep(0.02)
+        leader.cancel()
+        result = await follower
+        return leader, result
+
+    leader, result = asyncio.run(main())
+    assert leader.cancelled()
+    assert result == "answer"
+
+
+def test_do_async_cancels_call_when_nobody_waits(app):
+    flight = app.SingleFlight("test")
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    async def main():
+        callers = [asyncio.create_task(flight.do_async("k", slow)) for _ in range(2)]
+        await asyncio.sleep(0.02)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+    assert cancelled == [1]
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_sync_and_async_flights_do_not_mix(app):
+    flight = app.SingleFlight("test")
+    release = threading.Event()
+
+    def sync_call():
+        release.wait(5)
+        return "sync"
+
+    async def async_call():
+        return "async"
+
+    thread_result = []
+    thread = threading.Thread(target=lambda: thread_result.append(flight.do("k", sync_call)))
+    thread.start()
+    while flight.stats()["in_flight"] < 1:
+        time.sleep(0.01)
+    try:
+        assert asyncio.run(flight.do_async("k", async_call)) == "async"
+        assert list(flight.stream("k", lambda: iter(["stream"]))) == ["stream"]
+    finally:
+        release.set()
+        thread.join()
+    assert thread_result == ["sync"]
+
+
+def test_stream_replays_every_item_to_late_joiners(app):
+    flight = app.SingleFlight("test")
+    first_item = threading.Event()
+    release = threading.Event()
+
+    def produce():
+        yield "a"
+        first_item.set()
+        release.wait(5)
+        yield "ab"
+        yield "abc"
+
+    leader = flight.stream("k", produce)
+    assert next(leader) == "a"
+    first_item.wait(5)
+    follower = flight.stream("k", produce)
+    release.set()
+
+    assert list(follower) == ["a", "ab", "abc"]
+    assert list(leader) == ["ab", "abc"]
+    assert flight.stats() == {"leaders": 1, "shared": 1, "in_flight": 0}
+
+
+def test_stream_survives_a_caller_leaving(app):
+    flight = app.SingleFlight("test")
+    release = threading.Event()
+
+    def produce():
+        yield 1
+        release.wait(5)
+        yield 2
+
+    leader = flight.stream("k", produce)
+    follower = flight.stream("k", produce)
+    assert next(leader) == 1
+    assert next(follower) == 1
+    leader.close()
+    release.set()
+
+    assert list(follower) == [2]
@@ -0,0 +1,47 @@
+import sqlite3
+import threading
+
+
+def rows(path):
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT source FROM translations ORDER BY created").fetchall()
+
+
+def test_disk_tier_survives_a_restart(app, tmp_path):
+    path = str(tmp_path / "cache.db")
+    app.TranslationCache(db_path=path).set("hello  world", "hi", "namaste duniya")
+
+    cache = app.TranslationCache(db_path=path)
+    assert cache.get("hello world", "hi") == "namaste duniya"
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_expired_and_excess_rows_are_purged(app, tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = app.TranslationCache(db_path=path, max_rows=3, purge_every=0)
+    for index in range(5):
+        cache.set(f"text {index}", "hi", f"paath {index}")
+    with sqlite3.connect(path) as db:
+        db.execute("UPDATE translations SET created = 0 WHERE source = 'text 4'")
+
+    # Purged on open: the expired row, then the oldest beyond the cap
+    app.TranslationCache(db_path=path, ttl=3600, max_rows=3)
+    assert rows(path) == [("text 1",), ("text 2",), ("text 3",)]
+
+    cache = app.TranslationCache(db_path=path, max_rows=3, purge_every=2)
+    cache.set("text 5", "hi", "paath 5")
+    cache.set("text 6", "hi", "paath 6")
+    assert rows(path) == [("text 3",), ("text 5",), ("text 6",)]
+
+
+def test_memory_hits_do_not_wait_on_the_disk(app, tmp_path):
+    cache = app.TranslationCache(db_path=str(tmp_path / "cache.db"))
+    cache.set("hello", "hi", "namaste")
+
+    result = []
+    with cache._db_lock:
+        reader = threading.Thread(target=lambda: result.append(cache.get("hello", "hi")))
+        reader.start()
+        reader.join(timeout=1)
+        assert result == ["namaste"]
+    assert not reader.is_alive()
@@ -0,0 +1,64 @@
+import time
+
+import pytest
+
+
+def test_token_bucket_allows_bursts_then_waits(app):
+    bucket = app.TokenBucket(rate=10, capacity=2)
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == 0.0
+    assert 0 < bucket.try_acquire() <= 0.1
+
+
+def test_circuit_breaker_opens_and_half_opens(app):
+    breaker = app.CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == "half-open"
+    # Only one trial call while half-open
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def make_upstream(app, **kwargs):
+    upstream = app.Upstream("test", rate=1e9, burst=10 ** 9, base_delay=0.2, max_delay=0.2, **kwargs)
+    upstream._backoff = lambda attempt: 0.2
+    return upstream
+
+
+def test_upstream_retries_until_success(app):
+    upstream = make_upstream(app, max_attempts=3)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("503")
+        return "ok"
+
+    assert upstream.call(flaky) == "ok"
+    assert upstream.counters["retries"] == 2
+
+
+def test_upstream_does_not_retry_past_the_deadline(app):
+    upstream = make_upstream(app, max_attempts=5)
+    attempts = []
+
+    def failing():
+        attempts.append(1)
+        raise RuntimeError("504")
+
+    started = time.perf_counter()
+    with pytest.raises(RuntimeError):
+        upstream.call(failing, deadline=started + 0.3)
+
+    # The second attempt fits in the budget, a third backoff would not
+    assert len(attempts) == 2
+    assert time.perf_counter() - started < 0.3